@@ -0,0 +1,352 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""Benchmarks of the Package Remove service.
+
+The benchmarks generate synthetic lists of removable packages and time
+the hot paths of the service: its import, reading of the list, the kickstart
+round trip, the installation task and the D-Bus calls of the UI. The D-Bus
+benchmarks run the service in a child process connected to a private
+dbus-daemon, so the system and session buses are never touched.
+
+Run the benchmarks from the repository root:
+
+    PYTHONPATH=. python3 benchmarks/package_remove_benchmark.py --output results.json
+
+The results are written as JSON, so they can be compared across commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# numbers of packages in the generated lists
+SIZES = (1000, 10000, 100000)
+
+# every n-th package of the generated lists is selected by default
+SELECTED_STEP = 10
+
+# timeout for the service to appear on the private bus in seconds
+SERVICE_TIMEOUT = 30
+
+
+def generate_lines(size):
+    """Generate lines of a removable packages list."""
+    return [
+        "{}package-{:06d}".format("+" if i % SELECTED_STEP == 0 else "", i)
+        for i in range(size)
+    ]
+
+
+def write_list(directory, size):
+    """Write a removable packages list of the given size to a file."""
+    path = os.path.join(directory, "removable_pkgs_{}.list".format(size))
+
+    with open(path, "w") as f:
+        for line in generate_lines(size):
+            f.write(line + "\n")
+
+    return path
+
+
+def measure(func, repeat):
+    """Run the function repeatedly and return the times in seconds."""
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def create_result(name, size, times):
+    """Create a result of a benchmark."""
+    return {
+        "name": name,
+        "size": size,
+        "repeat": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+    }
+
+
+def create_service(list_path):
+    """Create the service that reads the given list."""
+    from org_fedoraproject_package_remove.service.package_remove import PackageRemove
+    from org_fedoraproject_package_remove.service.packages_list import PackagesListCache
+
+    service = PackageRemove()
+    service._packages_list_cache = PackagesListCache(list_path)  # pylint: disable=protected-access
+    return service
+
+
+def benchmark_packages_list(list_path, size, repeat):
+    """Time reading of the removable packages list."""
+    # pylint: disable=protected-access
+    service = create_service(list_path)
+
+    def read_cold():
+        service.invalidate_packages_list()
+        service._get_packages_list()
+
+    def read_warm():
+        service._get_packages_list()
+
+    return [
+        create_result("packages_list.cold", size, measure(read_cold, repeat)),
+        create_result("packages_list.warm", size, measure(read_warm, repeat)),
+    ]
+
+
+def benchmark_kickstart(size, repeat):
+    """Time parsing and generating of the kickstart section."""
+    from org_fedoraproject_package_remove.service.kickstart import PackageRemoveData
+
+    lines = [line + "\n" for line in generate_lines(size)]
+
+    def parse():
+        data = PackageRemoveData()
+
+        for line_number, line in enumerate(lines):
+            data.handle_line(line, line_number)
+
+        return data
+
+    data = parse()
+
+    def round_trip():
+        copy = PackageRemoveData()
+
+        # Skip the header and the end of the section.
+        for line in str(data).splitlines(keepends=True)[2:-1]:
+            copy.handle_line(line)
+
+    return [
+        create_result("kickstart.parse", size, measure(parse, repeat)),
+        create_result("kickstart.str", size, measure(lambda: str(data), repeat)),
+        create_result("kickstart.round_trip", size, measure(round_trip, repeat)),
+    ]
+
+
+def benchmark_installation(size, repeat):
+    """Time the installation task writing into a temporary system root."""
+    from org_fedoraproject_package_remove.constants import REMOVABLE_PACKAGES_FILE_PATH
+    from org_fedoraproject_package_remove.service.installation import \
+        PackageRemoveInstallationTask
+
+    pkgs = ["package-{:06d}".format(i) for i in range(size)]
+
+    with tempfile.TemporaryDirectory() as sysroot:
+        os.makedirs(os.path.join(sysroot, os.path.dirname(REMOVABLE_PACKAGES_FILE_PATH)))
+        task = PackageRemoveInstallationTask(sysroot=sysroot, pkgs=pkgs)
+        times = measure(task.run, repeat)
+
+    return [create_result("installation.run", size, times)]
+
+
+# modules imported by the service before it is registered on the bus
+SERVICE_MODULES = (
+    "org_fedoraproject_package_remove.service.package_remove",
+)
+
+# modules imported by the service on the first use
+LAZY_MODULES = (
+    "org_fedoraproject_package_remove.service.kickstart",
+    "org_fedoraproject_package_remove.service.installation",
+    "org_fedoraproject_package_remove.service.database",
+    "pyanaconda.core.configuration.anaconda",
+)
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    __import__(module)
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import(modules, repeat):
+    """Import the modules in fresh interpreters and return the times in seconds."""
+    times = []
+
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SCRIPT, *modules],
+            universal_newlines=True
+        )
+        times.append(float(output))
+
+    return times
+
+
+def benchmark_import(repeat):
+    """Time imports of the service before and after it is registered on the bus."""
+    return [
+        create_result("import.service", None, measure_import(SERVICE_MODULES, repeat)),
+        create_result("import.service_with_lazy_modules", None,
+                      measure_import(SERVICE_MODULES + LAZY_MODULES, repeat)),
+    ]
+
+
+def start_dbus_daemon():
+    """Start a private dbus-daemon.
+
+    :return: a tuple of the process and the address of the bus
+    """
+    process = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE,
+        universal_newlines=True
+    )
+    address = process.stdout.readline().strip()
+    return process, address
+
+
+def serve(address, list_path):
+    """Run the service on the private bus."""
+    from dasbus.connection import AddressedMessageBus
+    from dasbus.loop import EventLoop
+
+    from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE
+    from org_fedoraproject_package_remove.service.package_remove_interface import \
+        PackageRemoveInterface
+
+    bus = AddressedMessageBus(address)
+    service = create_service(list_path)
+    bus.publish_object(PACKAGE_REMOVE.object_path, PackageRemoveInterface(service))
+    bus.register_service(PACKAGE_REMOVE.service_name)
+    EventLoop().run()
+
+
+def get_service_proxy(bus):
+    """Wait for the service on the private bus and return its proxy."""
+    from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE
+
+    deadline = time.monotonic() + SERVICE_TIMEOUT
+
+    while not bus.proxy.NameHasOwner(PACKAGE_REMOVE.service_name):
+        if time.monotonic() > deadline:
+            raise RuntimeError("The service didn't start on the private bus.")
+
+        time.sleep(0.1)
+
+    return bus.get_proxy(PACKAGE_REMOVE.service_name, PACKAGE_REMOVE.object_path)
+
+
+def benchmark_dbus(list_path, size, repeat):
+    """Time the D-Bus calls of the UI against the service on a private bus."""
+    from dasbus.connection import AddressedMessageBus
+
+    daemon, address = start_dbus_daemon()
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", address, list_path]
+    )
+
+    try:
+        bus = AddressedMessageBus(address)
+        proxy = get_service_proxy(bus)
+        names = ["package-{:06d}".format(i) for i in range(size)]
+
+        results = [
+            create_result("dbus.lines", size, measure(lambda: proxy.Lines, repeat)),
+            create_result("dbus.set_lines", size, measure(lambda: proxy.SetLines(names), repeat)),
+        ]
+
+        bus.disconnect()
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+        daemon.terminate()
+        daemon.wait()
+
+
+def get_revision():
+    """Return the current git revision or None."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, repeat, with_dbus):
+    """Run all benchmarks and return the results."""
+    results = benchmark_import(repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            list_path = write_list(directory, size)
+            results.extend(benchmark_packages_list(list_path, size, repeat))
+            results.extend(benchmark_kickstart(size, repeat))
+            results.extend(benchmark_installation(size, repeat))
+
+            if with_dbus:
+                results.extend(benchmark_dbus(list_path, size, repeat))
+
+    return {
+        "revision": get_revision(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run benchmarks of the Package Remove service.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="numbers of packages in the generated lists")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of runs of every benchmark")
+    parser.add_argument("--no-dbus", action="store_true",
+                        help="skip the benchmarks that need dbus-daemon")
+    parser.add_argument("--output", default="-",
+                        help="a file to write the JSON results to")
+    parser.add_argument("--serve", nargs=2, metavar=("ADDRESS", "LIST"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    report = run_benchmarks(args.sizes, args.repeat, not args.no_dbus)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the bitmap of selected entries of the removable list.
+
+An entry is identified by its position in the list. The bitmap stores one
+bit per entry, so it is sent over D-Bus as a byte array. The bit of the n-th
+entry is the bit n % 8 of the byte n // 8, starting from the lowest bit.
+"""
+
+__all__ = ["Bitmap"]
+
+
+class Bitmap(object):
+    """The bitmap of selected entries."""
+
+    def __init__(self, size, data=b""):
+        """Create a new bitmap.
+
+        :param size: a number of entries
+        :param data: bytes of the bitmap; missing bits are cleared
+        """
+        self._size = size
+        self._data = bytearray((size + 7) // 8)
+
+        count = min(len(data), len(self._data))
+        self._data[:count] = bytes(data[:count])
+
+        # Clear the bits that don't belong to any entry.
+        if size % 8 and count == len(self._data):
+            self._data[-1] &= (1 << (size % 8)) - 1
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, position):
+        self._check_position(position)
+        return bool(self._data[position >> 3] & (1 << (position & 7)))
+
+    def __setitem__(self, position, selected):
+        self._check_position(position)
+
+        if selected:
+            self._data[position >> 3] |= 1 << (position & 7)
+        else:
+            self._data[position >> 3] &= ~(1 << (position & 7))
+
+    def __iter__(self):
+        """Iterate over positions of the selected entries."""
+        for i, byte in enumerate(self._data):
+            while byte:
+                bit = byte & -byte
+                yield (i << 3) + bit.bit_length() - 1
+                byte ^= bit
+
+    def count(self):
+        """Return a number of the selected entries."""
+        return bin(int.from_bytes(self._data, "little")).count("1")
+
+    def to_bytes(self):
+        """Return bytes of the bitmap."""
+        return bytes(self._data)
+
+    def _check_position(self, position):
+        """Check that the position belongs to an entry."""
+        if not 0 <= position < self._size:
+            raise IndexError("Position {} is out of range.".format(position))
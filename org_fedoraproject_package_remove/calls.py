@@ -0,0 +1,104 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the asynchronous D-Bus calls used by the spokes."""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+__all__ = ["AsyncCalls"]
+
+# the standard interface for access to D-Bus properties
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+
+class AsyncCalls(object):
+    """Asynchronous calls of a D-Bus service.
+
+    The calls don't wait for the service. Their results are passed to
+    callbacks run by the main loop, so a slow service never blocks the
+    user interface.
+
+    All calls in flight can be cancelled, for example when the user
+    leaves the spoke. A sent D-Bus call can't be taken back, so replies
+    of the cancelled calls are only ignored.
+    """
+
+    def __init__(self, service):
+        """Create new calls of the given service.
+
+        :param service: an identifier of the D-Bus service
+        :type service: DBusServiceIdentifier
+        """
+        self._interface_name = service.interface_name
+        self._proxy = service.get_proxy()
+        self._properties_proxy = service.get_proxy(interface_name=PROPERTIES_INTERFACE)
+        self._generation = 0
+
+    def cancel(self):
+        """Ignore replies of all calls in flight."""
+        self._generation += 1
+
+    def call(self, method_name, *args, callback=None, error_callback=None):
+        """Call a D-Bus method.
+
+        :param method_name: a name of the method
+        :param args: arguments of the method
+        :param callback: a function called with the result or None
+        :param error_callback: a function called with the exception if the call fails or None
+        """
+        method = getattr(self._proxy, method_name)
+        method(
+            *args,
+            callback=self._handle_reply,
+            callback_args=(method_name, self._generation, callback, error_callback)
+        )
+
+    def get_property(self, property_name, callback, error_callback=None):
+        """Get a value of a D-Bus property.
+
+        :param property_name: a name of the property
+        :param callback: a function called with the value
+        :param error_callback: a function called with the exception if the call fails or None
+        """
+        self._properties_proxy.Get(
+            self._interface_name,
+            property_name,
+            callback=self._handle_reply,
+            callback_args=(property_name, self._generation, callback, error_callback)
+        )
+
+    def _handle_reply(self, call, name, generation, callback, error_callback):
+        """Pass the result of the call to the callback."""
+        if generation != self._generation:
+            log.debug('The reply of %s is ignored.', name)
+            return
+
+        try:
+            result = call()
+        except Exception as e:  # pylint: disable=broad-except
+            log.error('The call of %s failed: %s', name, e)
+
+            if error_callback is not None:
+                error_callback(e)
+
+            return
+
+        if callback is not None:
+            callback(result)
@@ -46,4 +46,21 @@ PACKAGE_REMOVE = DBusServiceIdentifier(
 )
 
 PACKAGES_LIST_FILE_PATH = "/etc/anaconda/removable_pkgs.list"
+PACKAGES_LIST_DIR_PATH = "/etc/anaconda/removable_pkgs.list.d"
 REMOVABLE_PACKAGES_FILE_PATH = "etc/anaconda/pkgs_to_remove.list"
+
+# The root of the installation source. The installed system is a copy of the live
+# system, so its packages are known before anything is installed in the target.
+INSTALLATION_SOURCE_ROOT = "/"
+
+# Set this environment variable to a path of a JSON file with the installed packages
+# to use it instead of the RPM database of the installation source. Only for testing.
+FIXTURE_DATABASE_ENVIRONMENT_VARIABLE = "PACKAGE_REMOVE_FIXTURE_DATABASE"
+
+# Set this environment variable to collect timing statistics of the service.
+STATS_ENVIRONMENT_VARIABLE = "PACKAGE_REMOVE_STATS"
+
+# Set this environment variable or boot option to profile the service.
+PROFILING_ENVIRONMENT_VARIABLE = "PACKAGE_REMOVE_PROFILE"
+PROFILING_BOOT_OPTION = "inst.package_remove.profile"
+PROFILES_DIR_PATH = "/tmp"
@@ -24,18 +24,26 @@ import logging
 
 import gi
 import os
-import re
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, Pango
+from gi.repository import Gtk, Pango, GLib
 
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.spokes import NormalSpoke
 from pyanaconda.ui.common import FirstbootSpokeMixIn
+from pyanaconda.threading import threadMgr, AnacondaThread
+from pyanaconda.modules.common.task import async_run_task
+from pyanaconda.ui.communication import hubQ
+
+from blivet.size import Size
 
 # the path to addons is in sys.path so we can import things from org_fedoraproject_package_remove
+from org_fedoraproject_package_remove.bitmap import Bitmap
+from org_fedoraproject_package_remove.calls import AsyncCalls
 from org_fedoraproject_package_remove.categories.package_remove import PackageRemoveCategory
-from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH, REMOVABLE_PACKAGES_FILE_PATH
+from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH, \
+    PACKAGES_LIST_DIR_PATH, REMOVABLE_PACKAGES_FILE_PATH
+from org_fedoraproject_package_remove.search import PackageIndex
 
 log = logging.getLogger(__name__)
 
@@ -49,6 +57,12 @@ __all__ = ["PackageRemoveSpoke"]
 _ = lambda x: x
 N_ = lambda x: x
 
+# number of packages added to the list in one iteration of the main loop
+PACKAGES_BATCH_SIZE = 500
+
+# name of the thread that builds the search index
+THREAD_PACKAGE_INDEX = "AnaPackageRemoveIndexThread"
+
 
 class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
     """
@@ -69,7 +83,7 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
     # list all top-level objects from the .glade file that should be exposed
     # to the spoke or leave empty to extract everything
-    builderObjects = ["packageRemoveSpokeWindow", "buttonImage"]
+    builderObjects = ["packageRemoveSpokeWindow", "buttonImage", "packagesStore", "matchesStore"]
 
     # the name of the main window widget
     mainWidgetName = "packageRemoveSpokeWindow"
@@ -102,8 +116,31 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
         """
         NormalSpoke.__init__(self, data, storage, payload)
 
-        self._remove_count = 0
+        # the bitmap of the selected rows updated by the toggled handler
+        self._selection = Bitmap(0)
+        # the generation of the loaded list, is the whole list loaded
+        # and was the spoke initialized
+        self._generation = None
+        self._loaded = False
+        self._initialized = False
+        # the selection of the service and the choices kept from the
+        # previous generation of the list used for the loaded packages
+        self._service_selection = b""
+        self._previous_selection = {}
+        # names of the packages in the order of the list and their index
+        self._names = []
+        self._index = None
+        # positions of the packages that match the search or None
+        self._matches = None
+        # the last known values of the service properties
+        self._broken_count = 0
+        self._freed_bytes = 0
         self._package_remove_module = PACKAGE_REMOVE.get_proxy()
+        # calls that load the list, calls that read the impact of the removal
+        # and calls cancelled when the spoke is left
+        self._load_calls = AsyncCalls(PACKAGE_REMOVE)
+        self._impact_calls = AsyncCalls(PACKAGE_REMOVE)
+        self._calls = AsyncCalls(PACKAGE_REMOVE)
 
     def initialize(self):
         """
@@ -114,9 +151,67 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
         :see: pyanaconda.ui.common.UIObject.initialize
         """
         NormalSpoke.initialize(self)
-        self._entry = self.builder.get_object('textLines')
-        self._print_packages(self._package_remove_module.Lines)
-        self.apply()
+        self.initialize_start()
+
+        self._store = self.builder.get_object('packagesStore')
+        self._matches_store = self.builder.get_object('matchesStore')
+        self._view = self.builder.get_object('packagesView')
+        self._search_entry = self.builder.get_object('packagesSearchEntry')
+        self._select_matches_button = self.builder.get_object('selectMatchesButton')
+        self._progress_bar = self.builder.get_object('packagesProgressBar')
+        self._packages_count = 0
+
+        # Find packages that would be broken by the removal.
+        task_path = self._package_remove_module.AnalyzeImpactWithTask()
+        async_run_task(PACKAGE_REMOVE.get_proxy(task_path), self._impact_analyzed)
+
+        # Load the packages again when the list changes.
+        self._package_remove_module.ListChanged.connect(self._list_changed)
+
+        # Load the packages in batches without blocking the main loop.
+        GLib.idle_add(self._load_packages)
+
+    def _load_packages(self):
+        """Start loading of the packages.
+
+        Replies that belong to a previous generation of the list are
+        ignored. A change of the list during the loading restarts it.
+        """
+        self._load_calls.cancel()
+        self._load_calls.get_property(
+            "ListGeneration",
+            self._generation_received,
+            error_callback=self._loading_failed
+        )
+        return False
+
+    def _generation_received(self, generation):
+        """Request the selection of the service."""
+        self._generation = generation
+        self._load_calls.get_property(
+            "SelectionBitmap",
+            self._service_selection_received,
+            error_callback=self._loading_failed
+        )
+
+    def _service_selection_received(self, bitmap):
+        """Request the number of packages."""
+        self._service_selection = bitmap
+        self._load_calls.call(
+            "GetLinesCount",
+            callback=self._packages_count_received,
+            error_callback=self._loading_failed
+        )
+
+    def _packages_count_received(self, count):
+        """Request the first batch of packages."""
+        self._packages_count = count
+        self._selection = Bitmap(count, self._service_selection)
+        self._load_calls.call(
+            "GetEntriesRange", 0, PACKAGES_BATCH_SIZE,
+            callback=self._packages_batch_received,
+            error_callback=self._loading_failed
+        )
 
     def refresh(self):
         """
@@ -127,25 +222,39 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
         :see: pyanaconda.ui.common.UIObject.refresh
         """
         # self._print_packages(self._package_remove_module.Lines)
+        self._show_impact_warning()
+        self._calls.get_property("BrokenPackages", self._broken_packages_received)
 
     def apply(self):
         """
         The apply method that is called when the spoke is left. It should
         update the D-Bus service with values set in the GUI elements.
         """
-        rows = self._entry.get_children()
-        pkgs_to_remove = []
-        for row in rows:
-            grid_list = row.get_children()
-            grid = grid_list[0]
+        # Replies to requests of the left spoke are not needed anymore.
+        self._calls.cancel()
+
+        # Don't deselect the packages that weren't loaded.
+        if not self._loaded:
+            return
+
+        self._calls.call(
+            "SetSelectionBitmap", self._generation, self._selection.to_bytes(),
+            callback=self._selection_set
+        )
 
-            pkg_name = grid.get_child_at(0, 0)
-            check = grid.get_child_at(1, 0)
-            if check.get_active():
-                pkgs_to_remove.append(pkg_name.get_text())
+    def _selection_set(self, result):  # pylint: disable=unused-argument
+        """The selection was sent to the service."""
+        self._calls.get_property("EstimatedFreedBytes", self._freed_bytes_received)
 
-        self._remove_count = len(pkgs_to_remove)
-        self._package_remove_module.SetLines(pkgs_to_remove)
+    def _freed_bytes_received(self, freed_bytes):
+        """Show the estimate of the freed disk space on the hub."""
+        self._freed_bytes = freed_bytes
+        hubQ.send_message(self.__class__.__name__, self.status)
+
+    def _broken_packages_received(self, broken):
+        """Update the warning about the broken packages."""
+        self._broken_count = len(broken)
+        self._show_impact_warning()
 
     def execute(self):
         """
@@ -158,42 +267,184 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
         # for r in old_rows:
         #     self._entry.remove(r)
 
-    def _print_packages(self, pkgs_list):
-        for name in pkgs_list:
-            row = Gtk.ListBoxRow()
-            grd = Gtk.Grid()
+    def _impact_analyzed(self, task_proxy):
+        """The impact of the removal was analyzed."""
+        try:
+            task_proxy.Finish()
+        except Exception as e:  # pylint: disable=broad-except
+            log.error('Unable to analyze impact of the removal: %s', e)
+            return
+
+        self._impact_calls.get_property("BrokenPackages", self._broken_packages_received)
+        self._impact_calls.get_property("EstimatedFreedBytes", self._freed_bytes_received)
+
+    def _show_impact_warning(self):
+        """Warn about installed packages broken by the removal."""
+        if self._broken_count:
+            self.set_warning(_('Удаление выбранных пакетов нарушит зависимости '
+                               '{} установленных пакетов').format(self._broken_count))
+        else:
+            self.clear_info()
+
+    def _packages_batch_received(self, entries):
+        """Add the received batch of packages to the list and request the next one."""
+        # Ignore packages added to the list during the loading.
+        entries = entries[:self._packages_count - len(self._store)]
+        self._print_packages(entries)
+
+        if entries and len(self._store) < self._packages_count:
+            self._progress_bar.set_fraction(len(self._store) / self._packages_count)
+            self._load_calls.call(
+                "GetEntriesRange", len(self._store), PACKAGES_BATCH_SIZE,
+                callback=self._packages_batch_received,
+                error_callback=self._loading_failed
+            )
+            return
+
+        self._progress_bar.hide()
+        self._loaded = True
+        self._previous_selection = {}
+        self.apply()
+        self._finish_initialization()
+
+        # The index of the previous generation of the list might be still
+        # built, so every generation has its thread and the index of the
+        # previous one is ignored.
+        threadMgr.add(AnacondaThread(
+            name="{}-{}".format(THREAD_PACKAGE_INDEX, self._generation),
+            target=self._build_index,
+            args=(self._names, self._generation)
+        ))
+
+    def _loading_failed(self, error):  # pylint: disable=unused-argument
+        """Stop loading of the packages.
+
+        The selection of the service is kept, because the spoke
+        doesn't know all packages.
+        """
+        self._progress_bar.hide()
+        self.set_warning(_('Не удалось загрузить список пакетов'))
+        self._finish_initialization()
 
-            grd.set_column_homogeneous(False)
-            grd.set_row_homogeneous(False)
-            grd.insert_row(0)
-            grd.insert_column(0)
+    def _finish_initialization(self):
+        """Finish the initialization after the first loading of the packages."""
+        if self._initialized:
+            return
 
-            row.add(grd)
+        self._initialized = True
+        self.initialize_done()
 
-            label = Gtk.Label(valign=Gtk.Align.FILL)
-            label.set_use_markup(True)
-            label.set_selectable(False)
-            label.set_line_wrap(True)
-            label.set_hexpand(True)
-            label.set_vexpand(True)
-            label.set_justify(Gtk.Justification.LEFT)
-            label.set_halign(Gtk.Align.START)
-            label.props.margin_left = 10
+    def _list_changed(self, generation):
+        """Load the changed list of packages again.
 
-            checkbox = Gtk.CheckButton()
-            checkbox.props.margin_right = 20
-            checkbox.props.valign = Gtk.Align.CENTER
+        Positions of the packages might have changed, so the choices
+        of the user are kept by names of the packages.
+        """
+        if generation == self._generation:
+            return
+
+        log.debug('Loading the packages list of the generation %d.', generation)
+
+        for position, name in enumerate(self._names):
+            self._previous_selection[name] = self._selection[position]
+
+        self._loaded = False
+        self._names = []
+        self._index = None
+        self._show_matches(None)
+        self._store.clear()
+        self._search_entry.set_sensitive(False)
+        self._select_matches_button.set_sensitive(False)
+        self._progress_bar.set_fraction(0)
+        self._progress_bar.show()
+        self._load_packages()
+
+    def _build_index(self, names, generation):
+        """Build the search index of the loaded packages."""
+        index = PackageIndex(names)
+        GLib.idle_add(self._set_index, index, generation)
+
+    def _set_index(self, index, generation):
+        """Enable the search with the given index."""
+        if not self._loaded or generation != self._generation:
+            return False
+
+        self._index = index
+        self._search_entry.set_sensitive(True)
+        self._select_matches_button.set_sensitive(True)
+        self.on_search_changed(self._search_entry)
+        return False
 
-            if name.startswith('+'):
-                name = re.sub(r'^\+\ *', '', name)
-                checkbox.set_active(True)
+    def _show_matches(self, matches):
+        """Show only the packages at the given positions.
 
-            label.set_markup('<big>{}</big>'.format(name))
+        The matching packages are copied to a small store with their
+        positions, so the view doesn't filter all packages of the list.
 
-            grd.attach(label, 0, 0, 1, 1)
-            grd.attach(checkbox, 1, 0, 1, 1)
+        :param matches: a list of positions or None to show all packages
+        """
+        self._matches = matches
+
+        # Don't let the view follow every single row of the store.
+        self._view.set_model(None)
+        self._matches_store.clear()
+
+        if matches is None:
+            self._view.set_model(self._store)
+            return
+
+        for position in matches:
+            row = [self._names[position], self._selection[position], position]
+            self._matches_store.append(row)
+
+        self._view.set_model(self._matches_store)
+
+    def _print_packages(self, entries):
+        # The tree view creates cells only for the visible rows,
+        # so even a very long list doesn't need a widget per package.
+        for name, selected, _group in entries:
+            # Select the default packages in addition to the selection
+            # of the service, unless the user has chosen otherwise.
+            position = len(self._names)
+            selected = self._previous_selection.get(name, selected or self._selection[position])
+            self._selection[position] = selected
+            self._names.append(name)
+            self._store.append([name, selected])
+
+    def on_package_toggled(self, renderer, path):  # pylint: disable=unused-argument
+        """Invert the selection of the package in the toggled row."""
+        # Both stores are flat lists, so the path is a row number.
+        position = int(path)
+
+        if self._matches is None:
+            row = self._store[position]
+            row[1] = not row[1]
+        else:
+            row = self._matches_store[position]
+            row[1] = not row[1]
+            position = row[2]
+            self._store[position][1] = row[1]
 
-            self._entry.add(row)
+        self._selection[position] = row[1]
+
+    def on_search_changed(self, entry):
+        """Show only the packages that contain the searched text."""
+        text = entry.get_text().strip()
+        self._show_matches(self._index.find(text) if text else None)
+
+    def on_select_matches_clicked(self, button):  # pylint: disable=unused-argument
+        """Select all packages that match the search."""
+        for row in self._matches_store:
+            row[1] = True
+
+        matches = range(len(self._store)) if self._matches is None else self._matches
+
+        for i in matches:
+            row = self._store[i]
+
+            if not row[1]:
+                row[1] = True
+                self._selection[i] = True
 
     @property
     def ready(self):
@@ -230,7 +481,7 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
     @property
     def showable(self):
-        return os.path.exists(PACKAGES_LIST_FILE_PATH)
+        return os.path.exists(PACKAGES_LIST_FILE_PATH) or os.path.isdir(PACKAGES_LIST_DIR_PATH)
 
     @property
     def status(self):
@@ -242,7 +493,14 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalSpoke):
 
         :rtype: str
         """
-        if self._remove_count == 0:
+        selected_count = self._selection.count()
+
+        if not selected_count:
             return _('Выберете пакеты, которые будут удалены в установленной системе')
+
+        if self._freed_bytes:
+            return _('Вы выбрали {} пакетов, будет освобождено {}').format(
+                selected_count, Size(self._freed_bytes)
+            )
         else:
-            return _('Вы выбрали {} пакетов'.format(self._remove_count))
\ No newline at end of file
+            return _('Вы выбрали {} пакетов'.format(selected_count))
\ No newline at end of file
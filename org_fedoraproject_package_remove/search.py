@@ -0,0 +1,91 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module contains the search index of package names used by the spokes."""
+
+from array import array
+
+__all__ = ["PackageIndex"]
+
+# length of the substrings indexed for the substring search
+NGRAM_SIZE = 3
+
+
+class PackageIndex(object):
+    """The search index of package names.
+
+    The index is built once for a list of names. Names are identified by
+    their position in that list, so the results can be mapped to rows of
+    a list shown by a spoke. The search is case-insensitive.
+    """
+
+    def __init__(self, names):
+        """Build a new index.
+
+        :param names: a list of package names
+        :type names: List[str]
+        """
+        self._names = [name.lower() for name in names]
+
+        # n-grams mapped to sorted positions of names that contain them
+        self._ngrams = {}
+
+        for i, name in enumerate(self._names):
+            for ngram in set(self._get_ngrams(name)):
+                positions = self._ngrams.get(ngram)
+
+                if positions is None:
+                    positions = self._ngrams[ngram] = array("I")
+
+                positions.append(i)
+
+    def __len__(self):
+        return len(self._names)
+
+    def find(self, text):
+        """Find names that contain the given text.
+
+        :param text: a part of package names
+        :return: a sorted list of positions of the matching names
+        """
+        text = text.lower()
+
+        if len(text) < NGRAM_SIZE:
+            return [i for i, name in enumerate(self._names) if text in name]
+
+        # Start with the rarest n-gram, so there are as few candidates
+        # as possible. Every candidate has to be checked anyway, because
+        # the n-grams can appear in the name in a different order.
+        postings = []
+
+        for ngram in set(self._get_ngrams(text)):
+            positions = self._ngrams.get(ngram)
+
+            if positions is None:
+                return []
+
+            postings.append(positions)
+
+        postings.sort(key=len)
+        return [i for i in postings[0] if text in self._names[i]]
+
+    @staticmethod
+    def _get_ngrams(text):
+        """Generate n-grams of the given text."""
+        for i in range(len(text) - NGRAM_SIZE + 1):
+            yield text[i:i + NGRAM_SIZE]
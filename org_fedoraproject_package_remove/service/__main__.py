@@ -25,5 +25,10 @@ init()  # must be called before importing the service code
 
 # pylint:disable=wrong-import-position
 from org_fedoraproject_package_remove.service.package_remove import PackageRemove
+from org_fedoraproject_package_remove.service.profiling import is_profiling_enabled, run_profiled
 service = PackageRemove()
-service.run()
+
+if is_profiling_enabled():
+    run_profiled("service", service.run)
+else:
+    service.run()
@@ -0,0 +1,160 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module defines databases of installed packages.
+
+A database provides information about the installed packages and is able
+to erase them. There are two kinds of databases:
+  * RPM database - the database of a system root accessed with rpm.
+  * Fixture database - a JSON file with the same information, for testing.
+"""
+
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+__all__ = ["PackageRemovalError", "PackageDatabase", "RPMDatabase", "FixtureDatabase"]
+
+
+class PackageRemovalError(Exception):
+    """Packages can't be removed."""
+
+
+class PackageDatabase(object):
+    """The base class of databases of installed packages."""
+
+    def get_packages(self):
+        """Return dependencies and sizes of the installed packages.
+
+        The database is read only once for both.
+
+        :return: a list of tuples with a package name, its provides,
+                 its requires and its size in bytes
+        """
+        raise NotImplementedError()
+
+    def erase(self, names):
+        """Erase the given packages in a single transaction.
+
+        Packages that aren't installed are skipped. Dependencies broken
+        by the removal are logged, but they don't stop the removal.
+
+        :param names: names of packages to erase
+        :raise PackageRemovalError: if the transaction fails
+        """
+        raise NotImplementedError()
+
+
+class RPMDatabase(PackageDatabase):
+    """The RPM database of a system root."""
+
+    def __init__(self, root):
+        """Create a new database.
+
+        :param root: a path to the system root
+        """
+        self._root = root
+
+    def get_packages(self):
+        # The rpm module is available only in the installation environment.
+        import rpm
+
+        ts = rpm.TransactionSet(self._root)
+        packages = []
+
+        for header in ts.dbMatch():
+            # Files can be required too, so they are provides as well.
+            provides = header[rpm.RPMTAG_PROVIDENAME] + header[rpm.RPMTAG_FILENAMES]
+            requires = header[rpm.RPMTAG_REQUIRENAME]
+            packages.append((header[rpm.RPMTAG_NAME], provides, requires, header[rpm.RPMTAG_SIZE]))
+
+        return packages
+
+    def erase(self, names):
+        import rpm
+
+        ts = rpm.TransactionSet(self._root)
+
+        for name in names:
+            try:
+                ts.addErase(name)
+            except rpm.error:
+                log.warning('Package %s is not installed.', name)
+
+        # The user was warned about the broken packages before, so
+        # the unresolved dependencies don't stop the removal.
+        for problem in ts.check() or []:
+            log.warning('Unresolved dependency: %s', problem)
+
+        ts.order()
+        problems = ts.run(lambda *args: None, None)
+
+        if problems:
+            raise PackageRemovalError(
+                "Transaction failed: {}".format(", ".join(map(str, problems)))
+            )
+
+
+class FixtureDatabase(PackageDatabase):
+    """The database of packages stored in a JSON file.
+
+    The file contains an object with a "packages" object that maps
+    names of the installed packages to their data: lists of "provides"
+    and "requires" and the installed "size" in bytes.
+    """
+
+    def __init__(self, path):
+        """Create a new database.
+
+        :param path: a path to the JSON file
+        """
+        self._path = path
+
+    def _read(self):
+        """Read the packages from the file."""
+        with open(self._path) as f:
+            return json.load(f).get("packages", {})
+
+    def _write(self, packages):
+        """Replace the file with the given packages."""
+        tmp_path = self._path + ".tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump({"packages": packages}, f)
+
+        os.replace(tmp_path, self._path)
+
+    def get_packages(self):
+        return [
+            (name, data.get("provides", []), data.get("requires", []), data.get("size", 0))
+            for name, data in self._read().items()
+        ]
+
+    def erase(self, names):
+        packages = self._read()
+        missing = [name for name in names if name not in packages]
+
+        if missing:
+            log.warning('Packages %s are not installed.', ", ".join(missing))
+
+        for name in names:
+            packages.pop(name, None)
+
+        self._write(packages)
@@ -0,0 +1,199 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module defines the dependency graph of installed packages."""
+
+__all__ = ["DependencyGraph"]
+
+
+class DependencyGraph(object):
+    """The dependency graph of installed packages.
+
+    The graph finds installed packages that would be broken by removing
+    the selected packages. A package is broken if one of its requirements
+    is no longer provided by any package that stays installed.
+
+    The graph keeps the number of remaining providers of every capability
+    and the number of unavailable requirements of every package, so the
+    broken packages are updated incrementally when the removed packages
+    change. Only the packages affected by the change are visited.
+    """
+
+    def __init__(self, packages):
+        """Build a new graph.
+
+        :param packages: an iterable of tuples with a package name,
+                         its provides and its requires
+        """
+        self._provides = {}
+        self._requires = {}
+
+        for name, provides, requires in packages:
+            self._provides.setdefault(name, set()).update(provides)
+            self._requires.setdefault(name, set()).update(requires)
+
+        # capabilities mapped to numbers of their remaining providers
+        self._providers_count = {}
+
+        for name, provides in self._provides.items():
+            provides.add(name)
+
+            for capability in provides:
+                self._providers_count[capability] = self._providers_count.get(capability, 0) + 1
+
+        # capabilities mapped to packages that require them
+        self._requirers = {}
+
+        for name, requires in self._requires.items():
+            # Ignore requirements that aren't provided by anything.
+            requires.intersection_update(self._providers_count)
+
+            for capability in requires:
+                self._requirers.setdefault(capability, []).append(name)
+
+        # packages mapped to numbers of their unavailable requirements
+        self._missing = dict.fromkeys(self._provides, 0)
+
+        # removed packages and packages that are removed or broken
+        self._removed = set()
+        self._gone = set()
+
+    def __len__(self):
+        return len(self._provides)
+
+    @property
+    def names(self):
+        """Names of all installed packages."""
+        return list(self._provides)
+
+    @property
+    def broken_packages(self):
+        """Installed packages broken by the removal.
+
+        :return: a sorted list of package names
+        """
+        return sorted(self._gone - self._removed)
+
+    def remove(self, names):
+        """Remove packages from the graph.
+
+        :param names: names of packages
+        """
+        stack = []
+
+        for name in names:
+            if name in self._removed:
+                continue
+
+            self._removed.add(name)
+
+            if name in self._provides and name not in self._gone:
+                self._gone.add(name)
+                stack.append(name)
+
+        self._propagate_removal(stack)
+
+    def restore(self, names):
+        """Restore removed packages in the graph.
+
+        :param names: names of packages
+        """
+        for name in names:
+            if name not in self._removed:
+                continue
+
+            self._removed.discard(name)
+
+            if name in self._provides:
+                self._restore_package(name)
+
+    def _propagate_removal(self, stack):
+        """Update the graph after the given packages were removed or broken."""
+        while stack:
+            name = stack.pop()
+
+            for capability in self._provides[name]:
+                self._providers_count[capability] -= 1
+
+                if self._providers_count[capability]:
+                    continue
+
+                for requirer in self._requirers.get(capability, ()):
+                    self._missing[requirer] += 1
+
+                    if requirer not in self._gone:
+                        self._gone.add(requirer)
+                        stack.append(requirer)
+
+    def _restore_package(self, name):
+        """Update the graph after the given package was restored.
+
+        Packages that are broken can break each other in a cycle, so the
+        counters of the affected packages are recalculated as if they were
+        all installed and the removal is propagated among them again.
+        """
+        affected = self._find_affected_packages(name)
+
+        for package in affected:
+            self._gone.discard(package)
+
+            for capability in self._provides[package]:
+                self._providers_count[capability] += 1
+
+        # Requirers of the restored capabilities outside of the affected
+        # packages are removed packages. Update their counters too.
+        requirers = set(affected)
+
+        for package in affected:
+            for capability in self._provides[package]:
+                requirers.update(self._requirers.get(capability, ()))
+
+        for package in requirers:
+            self._missing[package] = sum(
+                1 for capability in self._requires[package]
+                if not self._providers_count[capability]
+            )
+
+        stack = []
+
+        for package in affected:
+            if self._missing[package]:
+                self._gone.add(package)
+                stack.append(package)
+
+        self._propagate_removal(stack)
+
+    def _find_affected_packages(self, name):
+        """Find the package and the broken packages that might depend on it."""
+        affected = {name}
+        stack = [name]
+
+        while stack:
+            package = stack.pop()
+
+            for capability in self._provides[package]:
+                if self._providers_count[capability]:
+                    continue
+
+                for requirer in self._requirers.get(capability, ()):
+                    if requirer in self._gone and requirer not in self._removed \
+                            and requirer not in affected:
+                        affected.add(requirer)
+                        stack.append(requirer)
+
+        return affected
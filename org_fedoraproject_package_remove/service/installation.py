@@ -42,10 +42,15 @@ from os.path import normpath, join as joinpath
 from pyanaconda.modules.common.task import Task
 
 from org_fedoraproject_package_remove.constants import REMOVABLE_PACKAGES_FILE_PATH
+from org_fedoraproject_package_remove.service.dependencies import DependencyGraph
+from org_fedoraproject_package_remove.service.sizes import SizeIndex
+from org_fedoraproject_package_remove.service.profiling import profiled
+from org_fedoraproject_package_remove.service.stats import timed
 
 log = logging.getLogger(__name__)
 
-__all__ = ["PackageRemoveConfigurationTask", "PackageRemoveInstallationTask"]
+__all__ = ["PackageRemoveConfigurationTask", "PackageRemoveImpactTask",
+           "PackageRemoveInstallationTask"]
 
 class PackageRemoveConfigurationTask(Task):
     """The PackageRemove configuration task.
@@ -57,6 +62,8 @@ class PackageRemoveConfigurationTask(Task):
     def name(self):
         return "Configure PackageRemove"
 
+    @profiled("PackageRemoveConfigurationTask")
+    @timed("PackageRemoveConfigurationTask.run")
     def run(self):
         """The run method performs the actual work.
 
@@ -65,25 +72,98 @@ class PackageRemoveConfigurationTask(Task):
         log.info('Running configuration task.')
 
 
+class PackageRemoveImpactTask(Task):
+    """The PackageRemove calculation task.
+
+    This task builds the dependency graph of the installed packages
+    that is used to find packages broken by the removal and the index
+    of their sizes.
+    """
+
+    def __init__(self, database):
+        """Create a new task.
+
+        :param database: a database of the installed packages
+        :type database: PackageDatabase
+        """
+        super().__init__()
+        self._database = database
+
+    @property
+    def name(self):
+        return "Analyze impact of PackageRemove"
+
+    @profiled("PackageRemoveImpactTask")
+    @timed("PackageRemoveImpactTask.run")
+    def run(self):
+        """The run method performs the actual work.
+
+        :return: a tuple with the dependency graph and the size index
+        :rtype: (DependencyGraph, SizeIndex)
+        """
+        packages = self._database.get_packages()
+
+        graph = DependencyGraph(
+            (name, provides, requires) for name, provides, requires, _ in packages
+        )
+        log.info('Dependency graph of %d packages built.', len(graph))
+
+        # Patterns in the list can match any installed package,
+        # so the sizes of all of them are needed. Packages can be
+        # installed in more versions, so their sizes are added up.
+        sizes = {}
+
+        for name, _, _, size in packages:
+            sizes[name] = sizes.get(name, 0) + size
+
+        sizes = SizeIndex(sizes)
+        log.info('Sizes of %d packages found.', len(sizes))
+
+        return graph, sizes
+
+
 class PackageRemoveInstallationTask(Task):
     """The PackageRemove installation task.
 
     This task runs at end of installation.
     """
 
-    def __init__(self, sysroot, pkgs):
+    def __init__(self, sysroot, pkgs, database=None):
+        """Create a new task.
+
+        :param sysroot: a path to the system root
+        :param pkgs: names of packages to remove
+        :param database: a database to erase the packages from or None
+                         to only write their names for a later removal
+        :type database: PackageDatabase
+        """
         super().__init__()
         self._sysroot = sysroot
         self._pkgs = pkgs
+        self._database = database
 
     @property
     def name(self):
         return "Install PackageRemove"
 
+    @profiled("PackageRemoveInstallationTask")
+    @timed("PackageRemoveInstallationTask.run")
     def run(self):
         """The run method performs the actual work."""
+        if self._database is not None:
+            self._erase_packages()
+            return
+
         package_remove_file_path = normpath(joinpath(self._sysroot, REMOVABLE_PACKAGES_FILE_PATH))
 
         with open(package_remove_file_path, "w") as f:
             for pkg in self._pkgs:
                 f.write('{}\n'.format(pkg))
+
+    def _erase_packages(self):
+        """Erase all packages in a single transaction."""
+        if not self._pkgs:
+            return
+
+        log.info('Removing %d packages.', len(self._pkgs))
+        self._database.erase(self._pkgs)
@@ -19,6 +19,7 @@
 """This module defines the parts needed for handling Kickstart data in the service."""
 
 import logging
+import shlex
 
 from pykickstart.options import KSOptionParser
 
@@ -27,16 +28,68 @@ from pyanaconda.core.kickstart.addon import AddonData
 
 log = logging.getLogger(__name__)
 
-__all__ = ["PackageRemoveData", "PackageRemoveKickstartSpecification"]
+__all__ = ["PackageRemoveData", "PackageRemoveKickstartSpecification", "read_packages_file"]
+
+
+def _parse_line(line):
+    """Parse a line with a package name.
+
+    :return: a tuple of the name and its "+" mark or None for blank lines,
+             comments and lines without a name
+    """
+    line = line.strip()
+
+    if not line or line.startswith("#"):
+        return None
+
+    selected = line.startswith("+")
+
+    if selected:
+        line = line[1:].lstrip()
+
+    if not line:
+        return None
+
+    return line, selected
+
+
+def read_packages_file(path):
+    """Read a file referenced by the --from-file option.
+
+    The file has the same syntax as the %addon section. It is read line
+    by line, so it is never loaded into memory as a whole.
+
+    :param path: a path to the file
+    :return: a generator of tuples with a package name and its "+" mark
+    """
+    with open(path) as f:
+        for line in f:
+            package = _parse_line(line)
+
+            if package is not None:
+                yield package
+
 
 class PackageRemoveData(AddonData):
-    """The kickstart data for the Package Remove addon."""
+    """The kickstart data for the Package Remove addon.
+
+    Every line of the section is a package name. Names marked with "+"
+    are selected for the removal, same as in the removable packages list.
+
+    The packages can be also read from a file referenced by the --from-file
+    option. The lines of the section then override the lines of the file.
+
+    Comments and blank lines of the section are not kept, so the generated
+    section contains only the options and the packages with their marks.
+    """
 
     def __init__(self):
         super().__init__()
-        self.lines = []
-        self.pkgs = []
+        # package names mapped to their "+" marks in the order of the section
+        self.packages = {}
         self.reverse = False
+        self.erase = False
+        self.from_file = ""
 
     def handle_header(self, args, line_number=None):
         """The handle_header method is called to parse additional arguments
@@ -70,11 +123,30 @@ class PackageRemoveData(AddonData):
             help="Reverse the display of the addon text."
         )
 
+        op.add_argument(
+            "--erase",
+            action="store_true",
+            default=False,
+            version=VERSION,
+            dest="erase",
+            help="Erase the selected packages during the installation."
+        )
+
+        op.add_argument(
+            "--from-file",
+            default="",
+            version=VERSION,
+            dest="from_file",
+            help="Read the packages from the given file."
+        )
+
         # Parse the arguments.
         ns = op.parse_args(args=args, lineno=line_number)
 
         # Store the result of the parsing.
         self.reverse = ns.reverse
+        self.erase = ns.erase
+        self.from_file = ns.from_file
 
     def handle_line(self, line, line_number=None):  # pylint: disable=unused-argument
         """The handle_line method that is called with every line from this
@@ -83,40 +155,65 @@ class PackageRemoveData(AddonData):
         For example, this kickstart...
 
         %addon org_fedoraproject_package_remove
-        Package remove!
-        foo bar baz
+        # documentation
+        +foo-doc
+        bar
         %end
 
-        ...will result in two calls to handle_line, once with "Package remove!"
-        and another time with "foo bar baz".
+        ...will result in three calls to handle_line. The comment is ignored,
+        foo-doc is selected for the removal and bar is only listed.
 
         :param line: a single line from the %addon section
         :type line: str
         :param line_number: number of the line
         :type line_number: int
         """
-        # simple example, we just append lines to the lines attribute
-        self.lines.append(line)
+        package = _parse_line(line)
+
+        if package is None:
+            return
+
+        # A repeated package stays selected if any of its lines is marked.
+        name, selected = package
+        self.packages[name] = selected or self.packages.get(name, False)
+
+    @property
+    def list(self):
+        """Names of all packages in the section."""
+        return list(self.packages)
+
+    @property
+    def remove(self):
+        """Names of the packages selected for the removal."""
+        return [name for name, selected in self.packages.items() if selected]
+
+    @remove.setter
+    def remove(self, names):
+        self.packages = dict.fromkeys(self.packages, False)
+        self.packages.update(dict.fromkeys(names, True))
 
     def __str__(self):
         """What should end up in the resulting kickstart file, i.e. the %addon
         section containing string representation of the stored data.
         """
-        section = "\n%addon org_fedoraproject_package_remove"
+        header = ["%addon org_fedoraproject_package_remove"]
 
         if self.reverse:
-            section += " --reverse"
+            header.append("--reverse")
+
+        if self.erase:
+            header.append("--erase")
 
-        section += "\n"
+        if self.from_file:
+            header.append("--from-file={}".format(shlex.quote(self.from_file)))
 
-        for line in self.lines:
-            section += line
+        lines = ["", " ".join(header)]
 
-        if not section.endswith('\n'):
-            section += "\n"
+        for name, selected in self.packages.items():
+            lines.append("+" + name if selected else name)
 
-        section += "%end\n"
-        return section
+        lines.append("%end\n")
+        return "\n".join(lines)
 
 
 class PackageRemoveKickstartSpecification(KickstartSpecification):
@@ -16,22 +16,37 @@
 # Red Hat, Inc.
 #
 import logging
+import os
+from threading import Thread
+
+from gi.repository import GLib
 
-from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.dbus import DBus
 from pyanaconda.core.signal import Signal
 from pyanaconda.modules.common.base import KickstartService
 from pyanaconda.modules.common.containers import TaskContainer
 
-from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH
+from org_fedoraproject_package_remove.bitmap import Bitmap
+from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH, \
+    PACKAGES_LIST_DIR_PATH, INSTALLATION_SOURCE_ROOT, FIXTURE_DATABASE_ENVIRONMENT_VARIABLE
 from org_fedoraproject_package_remove.service.package_remove_interface import PackageRemoveInterface
-from org_fedoraproject_package_remove.service.installation import PackageRemoveConfigurationTask, \
-    PackageRemoveInstallationTask
-from org_fedoraproject_package_remove.service.kickstart import PackageRemoveKickstartSpecification
+from org_fedoraproject_package_remove.service.packages_list import PackagesListCache
+from org_fedoraproject_package_remove.service.selection import PackageSelection
+from org_fedoraproject_package_remove.service.stats import stats, timed
+from org_fedoraproject_package_remove.service.watcher import PackagesListWatcher
 
 log = logging.getLogger(__name__)
 
-__all__ = ["PackageRemove"]
+__all__ = ["ListGenerationError", "PackageRemove"]
+
+# The kickstart support, the tasks and the configuration of Anaconda are
+# imported on the first use. The service is then registered on the bus
+# as soon as possible, which matters when many services start at once.
+
+
+class ListGenerationError(Exception):
+    """The list has changed since the given generation."""
+
 
 class PackageRemove(KickstartService):
     """The PackageRemove D-Bus service.
@@ -41,10 +56,36 @@ class PackageRemove(KickstartService):
 
     def __init__(self):
         super().__init__()
-        self._remove = []
+        self._remove = PackageSelection()
         self._list = []
+        self._erase = False
+        self._from_file = ""
+        self._from_file_loaded = True
+        # packages of the kickstart section not yet applied to the selection
+        self._pending_packages = {}
+        # packages selected by the file of the --from-file option
+        self._file_selection = set()
+        self._packages_list_cache = PackagesListCache(
+            PACKAGES_LIST_FILE_PATH,
+            PACKAGES_LIST_DIR_PATH
+        )
+        self._packages_list_watcher = PackagesListWatcher(
+            PACKAGES_LIST_FILE_PATH,
+            PACKAGES_LIST_DIR_PATH,
+            self._check_packages_list
+        )
+        # the list announced with the current generation of the list
+        # and the generation increased with every change of the list
+        self._packages_list = None
+        self._list_generation = 0
+        self._dependency_graph = None
+        self._size_index = None
 
-        self.remove_pkgs_changed = Signal()
+        self.list_changed = Signal()
+        self.selection_changed = Signal()
+        self.broken_packages_changed = Signal()
+        self.freed_bytes_changed = Signal()
+        self.impact_changed = Signal()
 
     def publish(self):
         """Publish the module."""
@@ -52,22 +93,159 @@ class PackageRemove(KickstartService):
         DBus.publish_object(PACKAGE_REMOVE.object_path, PackageRemoveInterface(self))
         DBus.register_service(PACKAGE_REMOVE.service_name)
 
+        # Read the list again only if the files change.
+        self._packages_list_watcher.start()
+        self._packages_list_cache.watched = True
+
+        # Read the list before a spoke asks for it.
+        Thread(
+            name="AnaPackageRemovePrefetchThread",
+            target=self._prefetch_packages_list,
+            daemon=True
+        ).start()
+
+    def _prefetch_packages_list(self):
+        """Read the package remove file and build its indexes."""
+        try:
+            packages_list = self._get_published_list()
+            names, _ = packages_list.build_index()
+            packages_list.entries  # pylint: disable=pointless-statement
+        except Exception as e:  # pylint: disable=broad-except
+            log.error('Failed to prefetch the packages list: %s', e)
+            return
+
+        log.debug('Packages list of %d packages prefetched.', len(names))
+
     @property
     def kickstart_specification(self):
         """Return the kickstart specification."""
+        from org_fedoraproject_package_remove.service.kickstart import \
+            PackageRemoveKickstartSpecification
         return PackageRemoveKickstartSpecification
 
     def process_kickstart(self, data):
         """Process the kickstart data."""
         log.debug('Processing kickstart data...')
-        self._list = data.addons.org_fedoraproject_package_remove.list
-        self._remove = data.addons.org_fedoraproject_package_remove.remove
+        addon_data = data.addons.org_fedoraproject_package_remove
+        self._erase = addon_data.erase
+        self._from_file = addon_data.from_file
+        self._from_file_loaded = not self._from_file
+        self._file_selection = set()
+
+        if self._from_file:
+            # The file is read when the selection is needed for the first time.
+            self._remove.replace([])
+            self._pending_packages = dict(addon_data.packages)
+        else:
+            self._remove.replace(addon_data.remove)
+            self._pending_packages = {}
 
     def setup_kickstart(self, data):
         """Set the given kickstart data."""
         log.debug('Generating kickstart data...')
-        data.addons.org_fedoraproject_package_remove.list = self._list
-        data.addons.org_fedoraproject_package_remove.remove = self._remove
+        addon_data = data.addons.org_fedoraproject_package_remove
+        addon_data.erase = self._erase
+        addon_data.from_file = self._from_file
+
+        if not self._from_file:
+            addon_data.remove = list(self._remove)
+        elif not self._from_file_loaded:
+            # The file wasn't read yet, so keep the section as it was.
+            addon_data.packages = dict(self._pending_packages)
+        else:
+            # Keep only the differences from the file in the section.
+            packages = {}
+
+            for name in self._remove:
+                if name not in self._file_selection:
+                    packages[name] = True
+
+            for name in sorted(self._file_selection):
+                if name not in self._remove:
+                    packages[name] = False
+
+            addon_data.packages = packages
+
+    def _check_packages_list(self):
+        """Read the list again after a change of the files."""
+        Thread(
+            name="AnaPackageRemoveRefreshThread",
+            target=self._refresh_packages_list,
+            daemon=True
+        ).start()
+
+    def _refresh_packages_list(self):
+        """Read the changed files of the list and announce the change."""
+        packages_list = self._packages_list_cache.refresh()
+        packages_list.entries  # pylint: disable=pointless-statement
+        GLib.idle_add(self._publish_current_list)
+
+    def _publish_current_list(self):
+        """Announce the current list of the cache if it has changed.
+
+        Refreshes can finish in any order and the universe of the
+        patterns can change meanwhile, so the list is not passed from
+        the refresh, but read from the cache again in the main loop.
+        """
+        old_packages_list = self._packages_list
+        packages_list = self._packages_list_cache.get()
+
+        if old_packages_list is not None \
+                and self._is_list_changed(old_packages_list, packages_list):
+            log.debug('Packages list has changed.')
+            self._publish_list(packages_list)
+        else:
+            # Positions of the entries are the same.
+            self._packages_list = packages_list
+
+        return False
+
+    @staticmethod
+    def _is_list_changed(old_packages_list, packages_list):
+        """Do the lists have different entries?
+
+        A rebuilt list can have the same entries, for example if a file
+        was only touched or the expanded patterns match the same packages.
+        """
+        return packages_list is not old_packages_list \
+            and packages_list.entries != old_packages_list.entries
+
+    def _get_published_list(self):
+        """Return the list of the current generation.
+
+        The cache is asked on every read, so a change of files that
+        aren't watched is found too. Positions of entries of a changed
+        list are valid only after the new generation is announced, so
+        the list of the current generation is returned until then.
+        """
+        packages_list = self._packages_list_cache.get()
+
+        if self._packages_list is None:
+            self._packages_list = packages_list
+        elif packages_list is not self._packages_list:
+            GLib.idle_add(self._publish_current_list)
+
+        return self._packages_list
+
+    def invalidate_packages_list(self):
+        """Read all files of the list again and announce a change."""
+        self._packages_list_cache.invalidate()
+        self._publish_current_list()
+
+    def _publish_list(self, packages_list):
+        """Announce a new generation of the list."""
+        self._packages_list = packages_list
+        self._list_generation += 1
+        self.list_changed.emit(self._list_generation)
+        return False
+
+    @property
+    def list_generation(self):
+        """The generation of the package remove file.
+
+        The generation is increased with every change of the list.
+        """
+        return self._list_generation
 
     @property
     def list(self):
@@ -75,25 +253,250 @@ class PackageRemove(KickstartService):
         self._get_packages_list()
         return self._list
 
+    @property
+    def lines_count(self):
+        """Number of lines of the package remove file."""
+        return len(self._get_published_list().lines)
+
+    def get_lines_range(self, offset, limit):
+        """Return at most limit lines of the package remove file.
+
+        :param offset: an index of the first line
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        return self._get_published_list().get_range(offset, limit)
+
+    def get_lines_matching(self, prefix, offset, limit):
+        """Return lines of the package remove file matching the prefix.
+
+        :param prefix: a prefix of package names
+        :param offset: a number of matching lines to skip
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        return self._get_published_list().get_matching(prefix, offset, limit)
+
+    @property
+    def entries(self):
+        """Parsed lines of the package remove file.
+
+        :return: a list of tuples with a package name, its "+" mark and its group
+        """
+        return self._get_published_list().entries
+
+    def get_entries_range(self, offset, limit):
+        """Return at most limit parsed lines of the package remove file.
+
+        :param offset: an index of the first line
+        :param limit: a maximal number of returned lines
+        :return: a list of tuples with a package name, its "+" mark and its group
+        """
+        return self._get_published_list().entries[offset:offset + limit]
+
+    @property
+    def packages_list_cache(self):
+        """The cache of the parsed package remove file."""
+        return self._packages_list_cache
+
+    def _get_selection(self):
+        """Return the selection of packages to remove.
+
+        The file of the --from-file option is read on the first call.
+        """
+        if not self._from_file_loaded:
+            self._load_from_file()
+
+        return self._remove
+
+    def _load_from_file(self):
+        """Read the file of the --from-file option into the selection."""
+        from org_fedoraproject_package_remove.service.kickstart import read_packages_file
+        log.debug('Reading packages from %s...', self._from_file)
+        selection = {}
+
+        try:
+            for name, selected in read_packages_file(self._from_file):
+                selection[name] = selected or selection.get(name, False)
+        except OSError as e:
+            log.error('Failed to read %s: %s', self._from_file, e)
+
+        self._file_selection = {name for name, selected in selection.items() if selected}
+
+        # The kickstart section overrides the file.
+        selection.update(self._pending_packages)
+        self._pending_packages = {}
+        self._from_file_loaded = True
+
+        self._remove.replace(name for name, selected in selection.items() if selected)
+
+    @timed("PackageRemove.set_pkgs_to_remove")
     def set_pkgs_to_remove(self, pkgs):
-        self._remove = pkgs
-        self.remove_pkgs_changed.emit()
+        added, removed = self._get_selection().replace(pkgs)
+        self._on_selection_changed(added, removed)
 
-    def _get_packages_list(self):
-        pkgs = []
-        with open(PACKAGES_LIST_FILE_PATH) as pkgs_list:
-            try:
-                for pkg in pkgs_list:
-                    if pkg.strip() != "" and pkg[0] != "#":
-                        pkgs.append(pkg.strip())
+    def select_packages(self, names):
+        """Add packages to the selection.
+
+        :param names: names of packages
+        """
+        added = self._get_selection().select(names)
+        self._on_selection_changed(added, [])
+
+    def deselect_packages(self, names):
+        """Remove packages from the selection.
+
+        :param names: names of packages
+        """
+        removed = self._get_selection().deselect(names)
+        self._on_selection_changed([], removed)
+
+    @property
+    def selection_bitmap(self):
+        """The selection of the entries of the package remove file.
+
+        :return: bytes of the bitmap indexed by positions of the entries
+        """
+        entries = self._get_published_list().entries
+        selection = self._get_selection()
+        bitmap = Bitmap(len(entries))
+
+        for i, (name, _, _) in enumerate(entries):
+            if name in selection:
+                bitmap[i] = True
+
+        return bitmap.to_bytes()
+
+    def set_selection_bitmap(self, generation, data):
+        """Set the selection of the entries of the package remove file.
+
+        Selected packages that are not in the file stay selected.
+        A package listed more than once is selected if any of its
+        entries is selected.
+
+        :param generation: a generation of the list the bitmap was built for
+        :param data: bytes of the bitmap indexed by positions of the entries
+        :raise ListGenerationError: if the list has changed since the generation
+        """
+        if generation != self._list_generation:
+            raise ListGenerationError(
+                "The bitmap was built for the list generation {}, but the current "
+                "generation is {}.".format(generation, self._list_generation)
+            )
+
+        entries = self._get_published_list().entries
+        bitmap = Bitmap(len(entries), data)
+        selected = {entries[i][0] for i in bitmap}
+        selection = self._get_selection()
+
+        added = selection.select(name for name, _, _ in entries if name in selected)
+        removed = selection.deselect(name for name, _, _ in entries if name not in selected)
+
+        self._on_selection_changed(added, removed)
+
+    def toggle_selection(self, names):
+        """Invert the selection of packages.
+
+        :param names: names of packages
+        """
+        added, removed = self._get_selection().toggle(names)
+        self._on_selection_changed(added, removed)
+
+    def _on_selection_changed(self, added, removed):
+        """Update the service after a change of the selection."""
+        if not added and not removed:
+            return
+
+        if self._dependency_graph is not None:
+            self._dependency_graph.remove(added)
+            self._dependency_graph.restore(removed)
+            self.broken_packages_changed.emit()
+
+        if self._size_index is not None:
+            self._size_index.remove(added)
+            self._size_index.restore(removed)
+            self.freed_bytes_changed.emit()
+
+        self.selection_changed.emit(added, removed)
 
-                self._list = sorted(pkgs)
+    @property
+    def broken_packages(self):
+        """Installed packages that would be broken by the removal.
+
+        The list is empty until the impact of the removal is analyzed.
+
+        :return: a sorted list of package names
+        """
+        if self._dependency_graph is None:
+            return []
+
+        return self._dependency_graph.broken_packages
+
+    @property
+    def estimated_freed_bytes(self):
+        """Estimated disk space freed by the removal in bytes.
+
+        The estimate is zero until the impact of the removal is analyzed.
+        """
+        if self._size_index is None:
+            return 0
+
+        return self._size_index.total
+
+    def analyze_impact_with_task(self):
+        """Analyze the impact of the removal with a task.
+
+        The task builds the dependency graph of the installed packages
+        and the index of their sizes. Both are then updated with every
+        change of the selection. Names of the installed packages are
+        used to expand patterns of the package remove file.
+
+        :return: a task
+        """
+        from org_fedoraproject_package_remove.service.installation import \
+            PackageRemoveImpactTask
+        task = PackageRemoveImpactTask(self._get_package_database())
+        task.succeeded_signal.connect(lambda: self._set_impact(*task.get_result()))
+        return task
+
+    def _set_impact(self, graph, size_index):
+        """Set the dependency graph and the size index."""
+        # Expand patterns of the list with the installed packages.
+        self._packages_list_cache.set_universe(graph.names)
+        self._publish_current_list()
 
-            except Exception as e:
-                log.error('Unable to process removable pakgs file.')
-                return
+        selection = self._get_selection()
 
-        log.debug('Packages list from {} getted succeessfully.'.format(PACKAGES_LIST_FILE_PATH))
+        graph.remove(selection)
+        self._dependency_graph = graph
+        self.broken_packages_changed.emit()
+
+        size_index.remove(selection)
+        self._size_index = size_index
+        self.freed_bytes_changed.emit()
+
+        self.impact_changed.emit()
+
+    def _get_package_database(self):
+        """Return the database of the packages that will be installed.
+
+        The analysis runs before the payload is installed, so the target
+        system has no packages yet. Read the installation source instead.
+        """
+        from org_fedoraproject_package_remove.service.database import RPMDatabase, \
+            FixtureDatabase
+
+        fixture_path = os.environ.get(FIXTURE_DATABASE_ENVIRONMENT_VARIABLE)
+
+        if fixture_path:
+            log.warning('Using the fixture database %s instead of RPM.', fixture_path)
+            return FixtureDatabase(fixture_path)
+
+        return RPMDatabase(INSTALLATION_SOURCE_ROOT)
+
+    @timed("PackageRemove._get_packages_list")
+    def _get_packages_list(self):
+        self._list = self._get_published_list().lines
 
     def configure_with_tasks(self):
         """Return configuration tasks.
@@ -103,8 +506,16 @@ class PackageRemove(KickstartService):
         Anaconda's code automatically calls the ***_with_tasks methods and
         stores the returned ***Task instances to later execute their run() methods.
         """
+        from org_fedoraproject_package_remove.service.installation import \
+            PackageRemoveConfigurationTask
+        tasks = [PackageRemoveConfigurationTask()]
+
+        # Installations without a spoke need the impact of the removal
+        # and the patterns of the list expanded too.
+        if self._dependency_graph is None:
+            tasks.append(self.analyze_impact_with_task())
 
-        return [PackageRemoveConfigurationTask()]
+        return tasks
 
     def install_with_tasks(self):
         """Return installation tasks.
@@ -114,9 +525,22 @@ class PackageRemove(KickstartService):
         Anaconda's code automatically calls the ***_with_tasks methods and
         stores the returned ***Task instances to later execute their run() methods.
         """
+        from pyanaconda.core.configuration.anaconda import conf
+        from org_fedoraproject_package_remove.service.database import RPMDatabase
+        from org_fedoraproject_package_remove.service.installation import \
+            PackageRemoveInstallationTask
+
+        database = None
+
+        if self._erase:
+            database = RPMDatabase(conf.target.system_root)
+
+        task = PackageRemoveInstallationTask(
+            sysroot=conf.target.system_root,
+            pkgs=list(self._get_selection()),
+            database=database
+        )
 
-        return [
-            PackageRemoveInstallationTask(
-                sysroot=conf.target.system_root,
-                pkgs=self._remove)
-        ] 
\ No newline at end of file
+        # This is the last task of the addon, so dump the stats after it.
+        task.stopped_signal.connect(stats.log_histograms)
+        return [task]
@@ -17,13 +17,15 @@
 #
 import logging
 
-from dasbus.server.interface import dbus_interface
+from dasbus.server.interface import dbus_interface, dbus_signal
 from dasbus.server.property import emits_properties_changed
 from dasbus.typing import *  # pylint: disable=wildcard-import,unused-wildcard-import
 
 from pyanaconda.modules.common.base import KickstartModuleInterface
+from pyanaconda.modules.common.containers import TaskContainer
 
 from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE
+from org_fedoraproject_package_remove.service.stats import stats, timed
 # from org_fedoraproject_package_remove.service.package_remove import PkgsList
 
 log = logging.getLogger(__name__)
@@ -42,13 +44,208 @@ class PackageRemoveInterface(KickstartModuleInterface):
 
     def connect_signals(self):
         super().connect_signals()
-        self.watch_property("Lines", self.implementation.remove_pkgs_changed)
+        self.implementation.list_changed.connect(self._list_changed)
+        self.implementation.selection_changed.connect(self.SelectionChanged)
+        self.watch_property("BrokenPackages", self.implementation.broken_packages_changed)
+        self.watch_property("EstimatedFreedBytes", self.implementation.freed_bytes_changed)
+        self.implementation.impact_changed.connect(self.flush_changes)
+
+    def _list_changed(self, generation):
+        """Emit PropertiesChanged and ListChanged after a change of the list.
+
+        The change doesn't come from a D-Bus call, so the changed
+        properties have to be flushed here.
+        """
+        for property_name in ("Lines", "Entries", "ListGeneration", "SelectionBitmap"):
+            self.report_changed_property(property_name)
+
+        self.flush_changes()
+        self.ListChanged(generation)
 
     @property
+    @timed("PackageRemoveInterface.Lines")
     def Lines(self) -> List[Str]:
         """Lines of the package remove file."""
         return self.implementation.list
 
+    @property
+    @timed("PackageRemoveInterface.Entries")
+    def Entries(self) -> List[Tuple[Str, Bool, Str]]:
+        """Parsed lines of the package remove file.
+
+        Every entry has a package name, True if the package is selected
+        by default and a name of the group of the package.
+        """
+        return self.implementation.entries
+
+    @timed("PackageRemoveInterface.GetEntriesRange")
+    def GetEntriesRange(self, offset: UInt32, limit: UInt32) -> List[Tuple[Str, Bool, Str]]:
+        """Get a range of parsed lines of the package remove file.
+
+        :param offset: an index of the first line
+        :param limit: a maximal number of returned lines
+        :return: a list of entries
+        """
+        return self.implementation.get_entries_range(offset, limit)
+
+    @property
+    @timed("PackageRemoveInterface.ListGeneration")
+    def ListGeneration(self) -> UInt32:
+        """The generation of the package remove file.
+
+        The generation is increased with every change of the list,
+        so the list can be cached until the generation changes.
+        """
+        return self.implementation.list_generation
+
+    @timed("PackageRemoveInterface.GetLinesCount")
+    def GetLinesCount(self) -> UInt32:
+        """Get a number of lines of the package remove file."""
+        return self.implementation.lines_count
+
+    @timed("PackageRemoveInterface.GetLinesRange")
+    def GetLinesRange(self, offset: UInt32, limit: UInt32) -> List[Str]:
+        """Get a range of lines of the package remove file.
+
+        :param offset: an index of the first line
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        return self.implementation.get_lines_range(offset, limit)
+
+    @timed("PackageRemoveInterface.GetLinesMatching")
+    def GetLinesMatching(self, prefix: Str, offset: UInt32, limit: UInt32) -> List[Str]:
+        """Get lines with package names starting with the given prefix.
+
+        :param prefix: a prefix of package names
+        :param offset: a number of matching lines to skip
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        return self.implementation.get_lines_matching(prefix, offset, limit)
+
     @emits_properties_changed
+    @timed("PackageRemoveInterface.SetLines")
     def SetLines(self, lines: List[Str]):
-        self.implementation.set_pkgs_to_remove(lines)
\ No newline at end of file
+        self.implementation.set_pkgs_to_remove(lines)
+
+    @emits_properties_changed
+    @timed("PackageRemoveInterface.SelectPackages")
+    def SelectPackages(self, names: List[Str]):
+        """Add packages to the selection of packages to remove.
+
+        :param names: names of packages
+        """
+        self.implementation.select_packages(names)
+
+    @emits_properties_changed
+    @timed("PackageRemoveInterface.DeselectPackages")
+    def DeselectPackages(self, names: List[Str]):
+        """Remove packages from the selection of packages to remove.
+
+        :param names: names of packages
+        """
+        self.implementation.deselect_packages(names)
+
+    @property
+    @timed("PackageRemoveInterface.SelectionBitmap")
+    def SelectionBitmap(self) -> List[Byte]:
+        """The selection of the entries of the package remove file.
+
+        The n-th bit of the bitmap is set if the n-th entry of the Entries
+        property is selected. See the bitmap module for the encoding.
+        """
+        return self.implementation.selection_bitmap
+
+    @emits_properties_changed
+    @timed("PackageRemoveInterface.SetSelectionBitmap")
+    def SetSelectionBitmap(self, generation: UInt32, bitmap: List[Byte]):
+        """Set the selection of the entries of the package remove file.
+
+        Selected packages that are not in the file stay selected. The call
+        fails if the list has changed since the given generation, because
+        the positions of the entries might have changed.
+
+        :param generation: the ListGeneration the bitmap was built for
+        :param bitmap: a bitmap of the selected entries
+        """
+        self.implementation.set_selection_bitmap(generation, bitmap)
+
+    @emits_properties_changed
+    @timed("PackageRemoveInterface.ToggleSelection")
+    def ToggleSelection(self, names: List[Str]):
+        """Invert the selection of the given packages.
+
+        :param names: names of packages
+        """
+        self.implementation.toggle_selection(names)
+
+    @timed("PackageRemoveInterface.AnalyzeImpactWithTask")
+    def AnalyzeImpactWithTask(self) -> ObjPath:
+        """Analyze which installed packages would be broken by the removal.
+
+        When the task finishes, the BrokenPackages property is kept up
+        to date with the selection of packages to remove.
+
+        :return: a DBus path of the task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.analyze_impact_with_task()
+        )
+
+    @property
+    @timed("PackageRemoveInterface.BrokenPackages")
+    def BrokenPackages(self) -> List[Str]:
+        """Installed packages that would be broken by the removal."""
+        return self.implementation.broken_packages
+
+    @property
+    @timed("PackageRemoveInterface.EstimatedFreedBytes")
+    def EstimatedFreedBytes(self) -> UInt64:
+        """Estimated disk space freed by the removal in bytes."""
+        return self.implementation.estimated_freed_bytes
+
+    @property
+    def Stats(self) -> Dict[Str, Dict[Str, Variant]]:
+        """Statistics of the service.
+
+        The timing statistics are collected only if the service runs
+        with the PACKAGE_REMOVE_STATS environment variable set. Hits
+        and misses of the cache of the list are always counted.
+
+        :return: a dictionary of names of the timed calls and their histograms
+                 and of the PackagesListCache entry with the cache counters
+        """
+        result = {
+            name: {
+                "count": get_variant(UInt64, histogram.count),
+                "total": get_variant(Double, histogram.total),
+                "min": get_variant(Double, histogram.min or 0.0),
+                "max": get_variant(Double, histogram.max or 0.0),
+                "buckets": get_variant(List[UInt64], histogram.buckets),
+            }
+            for name, histogram in stats.histograms.items()
+        }
+
+        cache = self.implementation.packages_list_cache
+        result["PackagesListCache"] = {
+            "hits": get_variant(UInt64, cache.hits),
+            "misses": get_variant(UInt64, cache.misses),
+        }
+
+        return result
+
+    @dbus_signal
+    def SelectionChanged(self, added: List[Str], removed: List[Str]):
+        """Signal that the selection of packages to remove has changed.
+
+        :param added: names of newly selected packages
+        :param removed: names of deselected packages
+        """
+
+    @dbus_signal
+    def ListChanged(self, generation: UInt32):
+        """Signal that the package remove file has changed.
+
+        :param generation: a new generation of the list
+        """
@@ -0,0 +1,548 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module handles reading of the removable packages list files.
+
+The list is assembled from the list file and sorted fragments in a drop-in
+directory. The files can be big, so the parsed content is cached and a file
+is read again only if it was replaced or modified.
+
+Besides package names, the list file can contain glob patterns such as
+"texlive-*" or "+ *-doc". The patterns are expanded against names of all
+installed packages, if they are known.
+
+Every package belongs to a group named after the fragment that lists it.
+A package listed in more fragments belongs to the group of the first one,
+even if the list file lists it too. Packages listed only in the list file
+and packages matched by patterns belong to the group with an empty name.
+"""
+
+import heapq
+import logging
+import os
+import re
+from bisect import bisect_left
+from fnmatch import translate
+from threading import Lock
+
+log = logging.getLogger(__name__)
+
+__all__ = ["PackagesList", "PackagesListCache"]
+
+
+def _get_package_name(line):
+    """Return a package name of the given line without the "+" mark."""
+    if line.startswith("+"):
+        return line[1:].lstrip(" ")
+
+    return line
+
+
+def _normalize_line(line):
+    """Return the given line with the "+" mark right before the package name."""
+    if line.startswith("+"):
+        return "+" + _get_package_name(line)
+
+    return line
+
+
+def _merge_lines(sorted_lines):
+    """Merge sorted lists of lines into one sorted list without duplicates.
+
+    A package listed more than once is kept once. The lines have to be
+    normalized, so marked lines of a package come before its unmarked
+    lines. The package is then marked if any of its lines is marked.
+
+    :param sorted_lines: a list of sorted lists of normalized lines
+    :return: a sorted list of lines
+    """
+    lines = []
+    names = set()
+
+    for line in heapq.merge(*sorted_lines):
+        name = _get_package_name(line)
+
+        if name not in names:
+            names.add(name)
+            lines.append(line)
+
+    return lines
+
+
+def _is_pattern(line):
+    """Is the given line a glob pattern?"""
+    return any(c in line for c in "*?[")
+
+
+def _group_by_length(strings):
+    """Group the given strings by their length.
+
+    :return: a list of tuples with a length and a set of strings
+    """
+    groups = {}
+
+    for string in strings:
+        groups.setdefault(len(string), set()).add(string)
+
+    return sorted(groups.items())
+
+
+def _compile_regex(patterns):
+    """Compile the given patterns into a single match function or None."""
+    if not patterns:
+        return None
+
+    return re.compile("|".join(map(translate, patterns))).match
+
+
+def _compile_patterns(patterns):
+    """Compile the given pattern lines into a single matcher.
+
+    Most patterns are a literal prefix or suffix, such as "texlive-*" or
+    "*-doc". They are grouped by length, so a name is matched by a few set
+    lookups of its beginnings and endings. The other patterns are compiled
+    into regular expressions grouped by their literal beginnings, so a name
+    is matched only against the patterns that can match it.
+
+    :return: a match function or None if there are no patterns
+    """
+    if not patterns:
+        return None
+
+    prefixes = []
+    suffixes = []
+    headed = {}
+    others = []
+
+    for pattern in map(_get_package_name, patterns):
+        head = re.split(r"[*?[]", pattern, maxsplit=1)[0]
+
+        if pattern == head + "*":
+            prefixes.append(head)
+        elif pattern.startswith("*") and not _is_pattern(pattern[1:]):
+            suffixes.append(pattern[1:])
+        elif head:
+            headed.setdefault(head, []).append(pattern)
+        else:
+            others.append(pattern)
+
+    prefixes = _group_by_length(prefixes)
+    suffixes = [(-length, group) for length, group in _group_by_length(suffixes)]
+    heads = _group_by_length(headed)
+    headed = {head: _compile_regex(group) for head, group in headed.items()}
+    match_others = _compile_regex(others)
+
+    def match(name):
+        for length, group in prefixes:
+            if name[:length] in group:
+                return True
+
+        for start, group in suffixes:
+            if name[start:] in group:
+                return True
+
+        for length, group in heads:
+            head = name[:length]
+
+            if head in group and headed[head](name):
+                return True
+
+        return bool(match_others and match_others(name))
+
+    return match
+
+
+def _expand_patterns(patterns, names, excluded):
+    """Expand the pattern lines in a single pass over package names.
+
+    :param patterns: a list of pattern lines
+    :param names: names of packages to match
+    :param excluded: names of packages to skip
+    :return: a list of lines for the matching packages
+    """
+    match = _compile_patterns(patterns)
+    match_selected = _compile_patterns([p for p in patterns if p.startswith("+")])
+    excluded = set(excluded)
+    lines = []
+
+    for name in names:
+        if name in excluded or not match(name):
+            continue
+
+        excluded.add(name)
+
+        # Only matching packages are checked for the "+" mark.
+        if match_selected and match_selected(name):
+            lines.append("+" + name)
+        else:
+            lines.append(name)
+
+    return lines
+
+
+class PackagesList(object):
+    """The parsed content of the removable packages list file.
+
+    The content never changes, so the list can be shared by threads.
+    The index of names is built on the first use and published with
+    a single assignment, so a concurrent reader never sees it half-built.
+    """
+
+    def __init__(self, lines, groups=None):
+        """Create a new packages list.
+
+        :param lines: sorted lines of the list file
+        :type lines: List[str]
+        :param groups: a dictionary of package names and their groups
+        :type groups: Dict[str, str]
+        """
+        self._lines = lines
+        self._groups = groups or {}
+        self._index = None
+        self._entries = None
+
+    @property
+    def lines(self):
+        """Sorted lines of the list file."""
+        return self._lines
+
+    @property
+    def entries(self):
+        """Parsed lines of the list file.
+
+        :return: a list of tuples with a package name, its "+" mark and its group
+        """
+        entries = self._entries
+
+        if entries is None:
+            entries = [self._get_entry(line) for line in self._lines]
+            self._entries = entries
+
+        return entries
+
+    def _get_entry(self, line):
+        """Parse the given line into an entry."""
+        name = _get_package_name(line)
+        return name, line.startswith("+"), self._groups.get(name, "")
+
+    @property
+    def names(self):
+        """Sorted package names of the list file."""
+        names, _ = self.build_index()
+        return names
+
+    def get_range(self, offset, limit):
+        """Return at most limit lines starting at the given offset.
+
+        :param offset: an index of the first line
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        return self._lines[offset:offset + limit]
+
+    def get_matching(self, prefix, offset, limit):
+        """Return lines with package names starting with the given prefix.
+
+        The matching lines are looked up in a sorted index of package
+        names, so only the returned lines are visited.
+
+        :param prefix: a prefix of package names
+        :param offset: a number of matching lines to skip
+        :param limit: a maximal number of returned lines
+        :return: a list of lines
+        """
+        names, names_lines = self.build_index()
+
+        start = bisect_left(names, prefix) + offset
+        end = min(start + limit, self._find_prefix_end(names, prefix))
+
+        return names_lines[start:end]
+
+    @staticmethod
+    def _find_prefix_end(names, prefix):
+        """Return an index behind the last name with the given prefix."""
+        if not prefix:
+            return len(names)
+
+        # The smallest string that is greater than all strings with the prefix.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return bisect_left(names, upper)
+
+    def build_index(self):
+        """Build the sorted index of package names.
+
+        :return: a tuple of sorted names and their lines
+        """
+        index = self._index
+
+        if index is None:
+            pairs = sorted((_get_package_name(line), line) for line in self._lines)
+            index = ([name for name, _ in pairs], [line for _, line in pairs])
+            self._index = index
+
+        return index
+
+
+class PackagesListCache(object):
+    """The cache of the parsed removable packages list files.
+
+    The list consists of the list file and fragments in the drop-in
+    directory. Every file is cached separately and keyed on its inode,
+    size and modification time, so unchanged files cost a single stat()
+    call and a change of one fragment re-reads only that fragment.
+
+    The cache can be used by multiple threads. A read of unchanged files
+    returns the current snapshot without locking. The snapshot is rebuilt
+    by one thread at a time.
+
+    If the files are watched, reads return the snapshot without checking
+    the files. The watcher then has to call refresh() after a change.
+    """
+
+    def __init__(self, path, dir_path=None):
+        """Create a new cache.
+
+        :param path: a path to the list file
+        :type path: str
+        :param dir_path: a path to the directory with *.list fragments
+        :type dir_path: str
+        """
+        self._path = path
+        self._dir_path = dir_path
+        self._files = {}
+        self._key = None
+        self._lines = []
+        self._groups = {}
+        self._patterns = []
+        self._universe = []
+        self._universe_generation = 0
+        self._snapshot = None
+        self._lock = Lock()
+        self._watched = False
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def watched(self):
+        """Are the files watched for changes?"""
+        return self._watched
+
+    @watched.setter
+    def watched(self, value):
+        self._watched = value
+
+    @property
+    def hits(self):
+        """Number of reads served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of reads that had to parse a file."""
+        return self._misses
+
+    def invalidate(self):
+        """Drop the cached content, so the next read parses the files again."""
+        with self._lock:
+            self._files = {}
+            self._key = None
+            self._snapshot = None
+
+    def set_universe(self, names):
+        """Set names of all packages the patterns are expanded against.
+
+        :param names: a list of package names
+        """
+        self._universe = names
+        self._universe_generation += 1
+
+    def get(self):
+        """Return the parsed list.
+
+        :return: the parsed content of the list files
+        :rtype: PackagesList
+        """
+        snapshot = self._snapshot
+
+        if self._watched and snapshot is not None \
+                and snapshot[0][1] == self._universe_generation:
+            self._hits += 1
+            return snapshot[1]
+
+        return self.refresh()
+
+    def refresh(self):
+        """Check the list files and return the parsed list.
+
+        Only new and changed files are parsed.
+
+        :return: the parsed content of the list files
+        :rtype: PackagesList
+        """
+        sources = self._get_sources()
+
+        if not sources:
+            log.error('Unable to access removable pkgs file %s.', self._path)
+            self.invalidate()
+            return PackagesList([])
+
+        key = tuple(sources)
+        snapshot = self._snapshot
+
+        if snapshot is not None and snapshot[0] == (key, self._universe_generation):
+            self._hits += 1
+            return snapshot[1]
+
+        with self._lock:
+            if key == self._key:
+                self._hits += 1
+            else:
+                self._misses += 1
+                self._key = key if self._update(sources) else None
+
+            expansion_key = (key, self._universe_generation)
+            snapshot = self._snapshot
+
+            if snapshot is None or snapshot[0] != expansion_key:
+                snapshot = (expansion_key, PackagesList(self._expand(), self._groups))
+                self._snapshot = snapshot
+
+            return snapshot[1]
+
+    def _get_sources(self):
+        """Return paths and keys of the existing list files."""
+        paths = [self._path]
+
+        if self._dir_path:
+            try:
+                names = sorted(os.listdir(self._dir_path))
+            except OSError:
+                names = []
+
+            paths.extend(
+                os.path.join(self._dir_path, name)
+                for name in names if name.endswith(".list")
+            )
+
+        sources = []
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            sources.append((path, (stat.st_ino, stat.st_size, stat.st_mtime_ns)))
+
+        return sources
+
+    def _update(self, sources):
+        """Update the cached content from the given list files.
+
+        Only new and changed files are parsed. The sorted lines of all
+        files are then merged.
+
+        :return: True if all files were parsed, otherwise False
+        """
+        files = {}
+        success = True
+
+        for path, key in sources:
+            cached = self._files.get(path)
+
+            if cached is None or cached[0] != key:
+                lines = self._read(path)
+
+                if lines is None:
+                    success = False
+                    continue
+
+                cached = (
+                    key,
+                    [line for line in lines if not _is_pattern(line)],
+                    [line for line in lines if _is_pattern(line)]
+                )
+
+                log.debug('Packages list from {} getted succeessfully.'.format(path))
+
+            files[path] = cached
+
+        self._files = files
+        self._lines = _merge_lines([lines for _, lines, _ in files.values()])
+        self._groups = self._get_groups(files)
+        self._patterns = [pattern for _, _, patterns in files.values() for pattern in patterns]
+        return success
+
+    def _get_groups(self, files):
+        """Return a dictionary of package names and their groups.
+
+        The list file has no group, so it is skipped. A package listed
+        in more fragments belongs to the group of the first one.
+        """
+        groups = {}
+
+        for path, (_, lines, _) in files.items():
+            if path == self._path:
+                continue
+
+            group = os.path.basename(path)[:-len(".list")]
+
+            for line in lines:
+                groups.setdefault(_get_package_name(line), group)
+
+        return groups
+
+    def _expand(self):
+        """Return sorted lines with the patterns expanded."""
+        if not self._patterns:
+            return self._lines
+
+        lines = _expand_patterns(
+            self._patterns,
+            self._universe,
+            map(_get_package_name, self._lines)
+        )
+
+        log.debug('%d patterns expanded to %d packages.', len(self._patterns), len(lines))
+
+        lines.sort()
+        return _merge_lines([self._lines, lines])
+
+    @staticmethod
+    def _read(path):
+        """Read, normalize and sort lines of a list file.
+
+        Sorting of an already sorted file takes linear time.
+
+        :return: sorted lines or None if the file can't be read
+        """
+        pkgs = []
+
+        try:
+            with open(path) as pkgs_list:
+                for pkg in pkgs_list:
+                    pkg = pkg.strip()
+                    if pkg != "" and pkg[0] != "#":
+                        pkgs.append(_normalize_line(pkg))
+
+        except (OSError, UnicodeDecodeError) as e:
+            log.error('Unable to process removable pakgs file: %s', e)
+            return None
+
+        pkgs.sort()
+        return pkgs
@@ -0,0 +1,115 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module allows to profile the service and its tasks.
+
+The profiling is enabled by the PACKAGE_REMOVE_PROFILE environment variable
+or the inst.package_remove.profile boot option. Every profiled call is then
+run in cProfile and its profile is written to a file in /tmp. The files can
+be loaded with the pstats module.
+"""
+
+import cProfile
+import logging
+import os
+import time
+from functools import wraps
+
+from org_fedoraproject_package_remove.constants import PROFILING_ENVIRONMENT_VARIABLE, \
+    PROFILING_BOOT_OPTION, PROFILES_DIR_PATH
+
+log = logging.getLogger(__name__)
+
+__all__ = ["is_profiling_enabled", "run_profiled", "profiled"]
+
+
+def _read_boot_options():
+    """Read options of the kernel command line."""
+    try:
+        with open("/proc/cmdline") as f:
+            return f.read().split()
+    except OSError:
+        return []
+
+
+def is_profiling_enabled():
+    """Is the profiling enabled?"""
+    if os.environ.get(PROFILING_ENVIRONMENT_VARIABLE):
+        return True
+
+    return PROFILING_BOOT_OPTION in _read_boot_options()
+
+
+_enabled = is_profiling_enabled()
+
+
+def run_profiled(name, func, *args, **kwargs):
+    """Run the function and write its profile to a file.
+
+    :param name: a name of the profile used in the file name
+    :param func: a function to run
+    :return: a result of the function
+    """
+    profile = cProfile.Profile()
+
+    try:
+        profile.enable()
+    except ValueError as e:
+        # Only one profiler can be active in some versions of Python.
+        log.warning('Failed to profile %s: %s', name, e)
+        return func(*args, **kwargs)
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        _dump_profile(name, profile)
+
+
+def _dump_profile(name, profile):
+    """Write the profile to a file."""
+    path = os.path.join(
+        PROFILES_DIR_PATH,
+        "package_remove-{}-{}-{}.prof".format(name, os.getpid(), int(time.time() * 1000))
+    )
+
+    try:
+        profile.dump_stats(path)
+    except OSError as e:
+        log.error('Failed to write the profile of %s: %s', name, e)
+        return
+
+    log.info('The profile of %s was written to %s.', name, path)
+
+
+def profiled(name):
+    """Return a decorator that profiles the calls if the profiling is enabled.
+
+    :param name: a name of the profiles
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            return run_profiled(name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,93 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module defines the selection of packages to remove."""
+
+__all__ = ["PackageSelection"]
+
+
+class PackageSelection(object):
+    """The selection of packages to remove.
+
+    All methods that change the selection return the names that were
+    actually added to or removed from the selection, so the changes can
+    be announced without sending the whole selection.
+    """
+
+    def __init__(self):
+        self._names = set()
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(sorted(self._names))
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def select(self, names):
+        """Add packages to the selection.
+
+        :param names: names of packages
+        :return: a list of added names
+        """
+        added = [name for name in dict.fromkeys(names) if name not in self._names]
+        self._names.update(added)
+        return added
+
+    def deselect(self, names):
+        """Remove packages from the selection.
+
+        :param names: names of packages
+        :return: a list of removed names
+        """
+        removed = [name for name in dict.fromkeys(names) if name in self._names]
+        self._names.difference_update(removed)
+        return removed
+
+    def toggle(self, names):
+        """Invert the selection of packages.
+
+        :param names: names of packages
+        :return: a tuple of lists of added and removed names
+        """
+        added = []
+        removed = []
+
+        for name in dict.fromkeys(names):
+            if name in self._names:
+                removed.append(name)
+            else:
+                added.append(name)
+
+        self._names.difference_update(removed)
+        self._names.update(added)
+        return added, removed
+
+    def replace(self, names):
+        """Replace the selection with the given packages.
+
+        :param names: names of packages
+        :return: a tuple of lists of added and removed names
+        """
+        names = set(names)
+        added = sorted(names - self._names)
+        removed = sorted(self._names - names)
+        self._names = names
+        return added, removed
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module defines the index of sizes of installed packages."""
+
+__all__ = ["SizeIndex"]
+
+
+class SizeIndex(object):
+    """The index of sizes of installed packages.
+
+    The index keeps a running total of the sizes of the removed packages,
+    so a change of the selection costs only a lookup per changed package.
+    """
+
+    def __init__(self, sizes):
+        """Create a new index.
+
+        :param sizes: a dictionary of package names and their sizes in bytes
+        """
+        self._sizes = sizes
+        self._total = 0
+
+    def __len__(self):
+        return len(self._sizes)
+
+    @property
+    def total(self):
+        """The total size of the removed packages in bytes."""
+        return self._total
+
+    def remove(self, names):
+        """Add sizes of the removed packages to the total.
+
+        :param names: names of packages
+        """
+        self._total += sum(self._sizes.get(name, 0) for name in names)
+
+    def restore(self, names):
+        """Subtract sizes of the restored packages from the total.
+
+        :param names: names of packages
+        """
+        self._total -= sum(self._sizes.get(name, 0) for name in names)
@@ -0,0 +1,135 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module collects timing statistics of the hot paths of the service.
+
+The statistics are collected only if the PACKAGE_REMOVE_STATS environment
+variable is set. Otherwise, a timed call costs only one extra check.
+"""
+
+import logging
+import os
+import time
+from functools import wraps
+from threading import Lock
+
+from org_fedoraproject_package_remove.constants import STATS_ENVIRONMENT_VARIABLE
+
+log = logging.getLogger(__name__)
+
+__all__ = ["Histogram", "Stats", "stats", "timed"]
+
+# number of buckets of a histogram; the last one is open-ended
+BUCKETS_COUNT = 24
+
+
+class Histogram(object):
+    """The histogram of durations of a timed call.
+
+    The bucket n counts durations shorter than 2^n microseconds that
+    don't fit into the previous bucket.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * BUCKETS_COUNT
+
+    def add(self, duration):
+        """Add a duration in seconds."""
+        self.count += 1
+        self.total += duration
+
+        if self.min is None or duration < self.min:
+            self.min = duration
+
+        if self.max is None or duration > self.max:
+            self.max = duration
+
+        bucket = int(duration * 1000000).bit_length()
+        self.buckets[min(bucket, BUCKETS_COUNT - 1)] += 1
+
+    def __str__(self):
+        return "count={} total={:.6f}s min={:.6f}s max={:.6f}s buckets={}".format(
+            self.count, self.total, self.min or 0.0, self.max or 0.0, self.buckets
+        )
+
+
+class Stats(object):
+    """The timing statistics of the service."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = Lock()
+
+    @property
+    def histograms(self):
+        """A dictionary of names of the timed calls and their histograms."""
+        with self._lock:
+            return dict(self._histograms)
+
+    def record(self, name, duration):
+        """Record a duration of the named call.
+
+        :param name: a name of the call
+        :param duration: a duration in seconds
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+
+            histogram.add(duration)
+
+    def timed(self, name):
+        """Return a decorator that records durations of the calls.
+
+        :param name: a name of the call
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                start = time.perf_counter()
+
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def log_histograms(self):
+        """Write the histograms to the log."""
+        if not self.enabled:
+            return
+
+        for name, histogram in sorted(self.histograms.items()):
+            log.info('Stats of %s: %s', name, histogram)
+
+
+stats = Stats(enabled=bool(os.environ.get(STATS_ENVIRONMENT_VARIABLE)))
+timed = stats.timed
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+"""This module defines the watcher of the removable packages list files."""
+
+import logging
+import os
+
+from gi.repository import Gio, GLib
+
+log = logging.getLogger(__name__)
+
+__all__ = ["PackagesListWatcher"]
+
+# delay in milliseconds that merges a burst of events into one change
+EVENTS_DELAY = 200
+
+# interval in seconds of the polling used if the files can't be monitored
+POLLING_INTERVAL = 5
+
+
+class PackagesListWatcher(object):
+    """The watcher of the removable packages list files.
+
+    The watcher monitors the directory of the list file and the drop-in
+    directory with GIO, which uses inotify. A burst of events is reported
+    as one change. If the directories can't be monitored, the watcher
+    reports a possible change periodically instead.
+
+    The callback is run by the main loop. It should check the files,
+    because a reported change doesn't have to change the list.
+    """
+
+    def __init__(self, path, dir_path, callback):
+        """Create a new watcher.
+
+        :param path: a path to the list file
+        :param dir_path: a path to the directory with *.list fragments
+        :param callback: a function called when the files might have changed
+        """
+        self._path = path
+        self._dir_path = dir_path
+        self._callback = callback
+        self._monitors = []
+        self._source_id = None
+
+    def start(self):
+        """Start watching the files."""
+        try:
+            for path in (os.path.dirname(self._path), self._dir_path):
+                monitor = Gio.File.new_for_path(path).monitor_directory(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+                monitor.connect("changed", self._on_changed)
+                self._monitors.append(monitor)
+        except GLib.Error as e:
+            log.warning('Unable to monitor the packages list, polling it instead: %s', e)
+            self.stop()
+            self._source_id = GLib.timeout_add_seconds(POLLING_INTERVAL, self._on_timeout)
+
+    def stop(self):
+        """Stop watching the files."""
+        for monitor in self._monitors:
+            monitor.cancel()
+
+        self._monitors = []
+
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _on_changed(self, monitor, changed_file, other_file, event_type):
+        """Schedule the callback if one of the list files has changed."""
+        # pylint: disable=unused-argument
+        paths = [f.get_path() for f in (changed_file, other_file) if f is not None]
+
+        if not any(self._is_watched(path) for path in paths):
+            return
+
+        if self._source_id is None:
+            self._source_id = GLib.timeout_add(EVENTS_DELAY, self._on_timeout)
+
+    def _is_watched(self, path):
+        """Is the given path one of the list files?"""
+        return path == self._path \
+            or path == self._dir_path \
+            or os.path.dirname(path) == self._dir_path
+
+    def _on_timeout(self):
+        """Run the callback."""
+        polling = not self._monitors
+
+        if not polling:
+            self._source_id = None
+
+        self._callback()
+        return polling
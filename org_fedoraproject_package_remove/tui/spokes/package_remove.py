@@ -28,20 +28,27 @@
 """Module with the class for the Package remove TUI spoke."""
 
 import logging
-import re, os
+import os
 
 from simpleline.render.screen import InputState
 from simpleline.render.containers import ListColumnContainer
 from simpleline.render.widgets import CheckboxWidget, EntryWidget, TextWidget
 
 from pyanaconda.ui.tui.spokes import NormalTUISpoke
+from pyanaconda.modules.common.task import async_run_task
 from pyanaconda.ui.common import FirstbootSpokeMixIn
 # Simpleline's dialog configured for use in Anaconda
 from pyanaconda.ui.tui.tuiobject import Dialog, PasswordDialog
 
+from blivet.size import Size
+
 # the path to addons is in sys.path so we can import things from org_fedoraproject_package_remove
+from org_fedoraproject_package_remove.bitmap import Bitmap
+from org_fedoraproject_package_remove.calls import AsyncCalls
 from org_fedoraproject_package_remove.categories.package_remove import PackageRemoveCategory
-from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH
+from org_fedoraproject_package_remove.constants import PACKAGE_REMOVE, PACKAGES_LIST_FILE_PATH, \
+    PACKAGES_LIST_DIR_PATH
+from org_fedoraproject_package_remove.search import PackageIndex
 
 log = logging.getLogger(__name__)
 
@@ -55,6 +62,17 @@ __all__ = ["PackageRemoveSpoke"]
 _ = lambda x: x
 N_ = lambda x: x
 
+# number of packages shown on one page of the spoke
+PACKAGES_PAGE_SIZE = 30
+
+# number of packages requested from the service in one call
+PACKAGES_BATCH_SIZE = 500
+
+# keys of the additional prompt options
+PROMPT_NEXT_PAGE = N_("n")
+PROMPT_PREVIOUS_PAGE = N_("p")
+PROMPT_FILTER = N_("f")
+
 
 class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
     """
@@ -89,9 +107,42 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         self.title = N_('Удаление пакетов')
 
         self._package_remove_module = PACKAGE_REMOVE.get_proxy()
-
-        self._remove = {}
+        # calls that load the list, calls that read the impact of the removal
+        # and calls cancelled when the spoke is left
+        self._load_calls = AsyncCalls(PACKAGE_REMOVE)
+        self._impact_calls = AsyncCalls(PACKAGE_REMOVE)
+        self._calls = AsyncCalls(PACKAGE_REMOVE)
+
+        # the last known values of the service properties
+        self._broken_count = 0
+        self._freed_bytes = 0
+
+        # the generation of the list, names of the packages in the order
+        # of the list and the bitmap of the selected ones indexed by their
+        # positions in the list
+        self._generation = None
         self._list = []
+        self._selection = Bitmap(0)
+
+        # is the whole list loaded, did the loading fail and the data of
+        # the service received during the loading
+        self._loaded = False
+        self._loading_failed = False
+        self._service_selection = b""
+        self._packages_count = 0
+        self._entries = []
+
+        # the number of selected packages and the choices of the user not
+        # yet accepted by the service kept by names of the packages, so
+        # they survive a change of the list
+        self._selected_count = 0
+        self._pending_choices = {}
+
+        # the current page, the filter and the positions of matching packages
+        self._page = 0
+        self._filter = ""
+        self._matches = None
+        self._index = None
 
     def initialize(self):
         """
@@ -103,17 +154,142 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         """
         NormalTUISpoke.initialize(self)
 
-        pkgs_list = self._package_remove_module.Lines
+        # Load the packages again when the list changes.
+        self._package_remove_module.ListChanged.connect(self._list_changed)
+
+        # Load the packages in batches without blocking the main loop.
+        self._load_packages()
+
+        # Find packages that would be broken by the removal.
+        task_path = self._package_remove_module.AnalyzeImpactWithTask()
+        async_run_task(PACKAGE_REMOVE.get_proxy(task_path), self._impact_analyzed)
+
+    def _impact_analyzed(self, task_proxy):
+        """The impact of the removal was analyzed."""
+        try:
+            task_proxy.Finish()
+        except Exception as e:  # pylint: disable=broad-except
+            log.error('Unable to analyze impact of the removal: %s', e)
+            return
+
+        self._impact_calls.get_property("BrokenPackages", self._broken_packages_received)
+        self._impact_calls.get_property("EstimatedFreedBytes", self._freed_bytes_received)
+
+    def _load_packages(self):
+        """Start loading of the packages.
+
+        Replies that belong to a previous generation of the list are
+        ignored. A change of the list during the loading restarts it.
+        """
+        self._load_calls.cancel()
+        self._loaded = False
+        self._loading_failed = False
+        self._entries = []
+        self._load_calls.get_property(
+            "ListGeneration",
+            self._generation_received,
+            error_callback=self._load_failed
+        )
+
+    def _generation_received(self, generation):
+        """Request the selection of the service."""
+        self._generation = generation
+        self._load_calls.get_property(
+            "SelectionBitmap",
+            self._service_selection_received,
+            error_callback=self._load_failed
+        )
+
+    def _service_selection_received(self, bitmap):
+        """Request the number of packages."""
+        self._service_selection = bitmap
+        self._load_calls.call(
+            "GetLinesCount",
+            callback=self._packages_count_received,
+            error_callback=self._load_failed
+        )
+
+    def _packages_count_received(self, count):
+        """Request the first batch of packages."""
+        self._packages_count = count
+        self._request_packages_batch()
+
+    def _request_packages_batch(self):
+        """Request the next batch of packages."""
+        self._load_calls.call(
+            "GetEntriesRange", len(self._entries), PACKAGES_BATCH_SIZE,
+            callback=self._packages_batch_received,
+            error_callback=self._load_failed
+        )
+
+    def _packages_batch_received(self, entries):
+        """Keep the received batch of packages and request the next one."""
+        # Ignore packages added to the list during the loading.
+        entries = entries[:self._packages_count - len(self._entries)]
+        self._entries.extend(entries)
+
+        if entries and len(self._entries) < self._packages_count:
+            self._request_packages_batch()
+            return
+
+        self._set_packages(self._entries)
+        self._entries = []
+        self._loaded = True
+
+        self._index = None
+        self._set_filter(self._filter)
+        self.apply()
+        self.redraw()
+
+    def _load_failed(self, error):  # pylint: disable=unused-argument
+        """Stop loading of the packages.
+
+        The selection of the service is kept, because the spoke
+        doesn't know all packages.
+        """
+        self._loading_failed = True
+        self.redraw()
+
+    def _set_packages(self, entries):
+        """Set the loaded packages and their selection.
 
-        for pkg in pkgs_list:
-            if pkg.startswith('+'):
-                pkg = re.sub(r'^\+\ *', '', pkg)
-                self._remove[pkg] = True 
-            else:
-                self._remove[pkg] = False
+        The default packages are selected in addition to the selection
+        of the service, unless the user has chosen otherwise.
 
-        self.apply()      
+        :param entries: a list of entries of the packages list
+        """
+        self._selection = Bitmap(len(entries), self._service_selection)
+        self._list = []
+        choices = {}
+
+        for i, (pkg, selected, _group) in enumerate(entries):
+            selected = self._pending_choices.get(pkg, selected or self._selection[i])
+
+            if selected != self._selection[i]:
+                self._selection[i] = selected
+                choices[pkg] = selected
+
+            self._list.append(pkg)
+
+        # Choices of packages that aren't in the list anymore are dropped.
+        self._pending_choices = choices
+
+        self._selected_count = self._selection.count()
 
+    def _list_changed(self, generation):
+        """Load the changed list of packages again.
+
+        Positions of the packages might have changed, so the choices
+        of the user are kept by names of the packages.
+        """
+        if generation == self._generation:
+            return
+
+        log.debug('Loading the packages list of the generation %d.', generation)
+
+        self._list = []
+        self._selection = Bitmap(0)
+        self._load_packages()
 
     def refresh(self, args=None):
         """
@@ -131,22 +307,86 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         super().refresh(args)
 
         self._container = ListColumnContainer(columns=3)
+
+        if not self._loaded:
+            self.window.add_with_separator(TextWidget(
+                _('Не удалось загрузить список пакетов') if self._loading_failed
+                else _('Загрузка списка пакетов...')
+            ))
+            return
+
+        # Show only the current page of the list, so a redraw
+        # doesn't print all packages again.
+        positions = range(len(self._list)) if self._matches is None else self._matches
+        pages_count = max(1, -(-len(positions) // PACKAGES_PAGE_SIZE))
+        self._page = min(self._page, pages_count - 1)
+        start = self._page * PACKAGES_PAGE_SIZE
+
+        if self._broken_count:
+            self.window.add_with_separator(TextWidget(
+                _('Удаление выбранных пакетов нарушит зависимости '
+                  '{} установленных пакетов').format(self._broken_count)
+            ))
+
+        if self._filter:
+            self.window.add_with_separator(TextWidget(_('Фильтр: {}').format(self._filter)))
+
         self.window.add(self._container)
 
-        for pkg in self._remove:
-            c = CheckboxWidget(title=pkg, completed=(self._remove.get(pkg)))
-            self._container.add(c, self._checkbox_called, pkg)
+        for i in positions[start:start + PACKAGES_PAGE_SIZE]:
+            c = CheckboxWidget(title=self._list[i], completed=self._selection[i])
+            self._container.add(c, self._checkbox_called, (self._generation, i))
 
         self._window.add_separator()
+        self.window.add_with_separator(TextWidget(
+            _('Страница {} из {}').format(self._page + 1, pages_count)
+        ))
 
     def apply(self):
         """
         The apply method that is called when the spoke is left. It should
         update the contents of self.data with values set in the spoke.
         """
-        # Dunno why it doesn't work, now just leave it
-        # def execute doesn't work too
-        # self._package_remove_module.SetLines(self._remove)
+        # Replies to requests of the left spoke are not needed anymore.
+        self._calls.cancel()
+
+        # Don't deselect the packages that weren't loaded.
+        if not self._loaded or not self._pending_choices:
+            return
+
+        # Push the whole selection as a bitmap, which costs a bit per package.
+        # The call doesn't wait for the service, which handles calls in order.
+        choices = dict(self._pending_choices)
+        self._calls.call(
+            "SetSelectionBitmap", self._generation, self._selection.to_bytes(),
+            callback=lambda result: self._selection_set(choices),
+            error_callback=self._selection_failed
+        )
+
+    def _selection_set(self, choices):
+        """The service accepted the given choices of the user."""
+        for pkg, selected in choices.items():
+            # The package might have been toggled again meanwhile.
+            if self._pending_choices.get(pkg) == selected:
+                del self._pending_choices[pkg]
+
+        self._calls.get_property("BrokenPackages", self._broken_packages_received)
+        self._calls.get_property("EstimatedFreedBytes", self._freed_bytes_received)
+
+    def _selection_failed(self, error):  # pylint: disable=unused-argument
+        """The service refused the selection.
+
+        The list has changed since it was loaded. The choices are kept
+        and sent again when the changed list is loaded.
+        """
+
+    def _broken_packages_received(self, broken):
+        """Update the number of the broken packages."""
+        self._broken_count = len(broken)
+
+    def _freed_bytes_received(self, freed_bytes):
+        """Update the estimate of the freed disk space."""
+        self._freed_bytes = freed_bytes
 
     def execute(self):
         """
@@ -170,7 +410,7 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
 
     @property
     def showable(self):
-        return os.path.exists(PACKAGES_LIST_FILE_PATH)
+        return os.path.exists(PACKAGES_LIST_FILE_PATH) or os.path.isdir(PACKAGES_LIST_DIR_PATH)
 
     @property
     def status(self):
@@ -182,15 +422,15 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
 
         :rtype: str
         """
-        pkgs_count = len([pkg for pkg in self._remove if self._remove.get(pkg)])
-        
-        # FIXME: move it to apply/execute
-        self._package_remove_module.SetLines([pkg for pkg in self._remove if self._remove.get(pkg)])
-
-        if pkgs_count == 0:
+        if self._selected_count == 0:
             return _('Выберете пакеты, которые будут удалены в установленной системе')
+
+        if self._freed_bytes:
+            return _('Вы выбрали {} пакетов, будет освобождено {}').format(
+                self._selected_count, Size(self._freed_bytes)
+            )
         else:
-            return _('Вы выбрали {} пакетов'.format(pkgs_count))
+            return _('Вы выбрали {} пакетов'.format(self._selected_count))
 
     def input(self, args, key):
         """
@@ -208,11 +448,59 @@ class PackageRemoveSpoke(FirstbootSpokeMixIn, NormalTUISpoke):
         """
         if self._container.process_user_input(key):
             return InputState.PROCESSED_AND_REDRAW
-        else:
-            return super().input(args=args, key=key)
+
+        if key.lower() == _(PROMPT_NEXT_PAGE):
+            self._page += 1
+            return InputState.PROCESSED_AND_REDRAW
+
+        if key.lower() == _(PROMPT_PREVIOUS_PAGE):
+            self._page = max(0, self._page - 1)
+            return InputState.PROCESSED_AND_REDRAW
+
+        if key.lower() == _(PROMPT_FILTER):
+            self._set_filter(Dialog(_('Фильтр пакетов')).run().strip())
+            return InputState.PROCESSED_AND_REDRAW
+
+        return super().input(args=args, key=key)
+
+    def prompt(self, args=None):
+        """
+        The prompt method that returns the prompt shown to the user.
+
+        :param args: optional argument that may be used when the screen is
+                     scheduled
+        :type args: anything
+        :return: the prompt
+        :rtype: simpleline.render.prompt.Prompt
+        """
+        prompt = super().prompt(args)
+        prompt.add_option(_(PROMPT_NEXT_PAGE), _('следующая страница'))
+        prompt.add_option(_(PROMPT_PREVIOUS_PAGE), _('предыдущая страница'))
+        prompt.add_option(_(PROMPT_FILTER), _('фильтр'))
+        return prompt
+
+    def _set_filter(self, text):
+        """Show only the packages that contain the given text."""
+        self._filter = text
+        self._page = 0
+
+        if not text:
+            self._matches = None
+            return
+
+        if self._index is None:
+            self._index = PackageIndex(self._list)
+
+        self._matches = self._index.find(text)
 
     def _checkbox_called(self, data):
-        if self._remove.get(data):
-            self._remove[data] = False
-        else:
-            self._remove[data] = True
\ No newline at end of file
+        generation, position = data
+
+        # The list has changed since the checkbox was shown.
+        if generation != self._generation:
+            return
+
+        selected = not self._selection[position]
+        self._selection[position] = selected
+        self._selected_count += 1 if selected else -1
+        self._pending_choices[self._list[position]] = selected
@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+from org_fedoraproject_package_remove.bitmap import Bitmap
+
+
+class BitmapTestCase(unittest.TestCase):
+    """Test the bitmap of selected entries."""
+
+    def test_empty(self):
+        bitmap = Bitmap(10)
+        self.assertEqual(len(bitmap), 10)
+        self.assertEqual(bitmap.count(), 0)
+        self.assertEqual(list(bitmap), [])
+        self.assertEqual(bitmap.to_bytes(), b"\x00\x00")
+
+    def test_set_bits(self):
+        bitmap = Bitmap(20)
+        bitmap[0] = True
+        bitmap[9] = True
+        bitmap[19] = True
+
+        self.assertTrue(bitmap[9])
+        self.assertFalse(bitmap[8])
+        self.assertEqual(list(bitmap), [0, 9, 19])
+        self.assertEqual(bitmap.count(), 3)
+        self.assertEqual(bitmap.to_bytes(), b"\x01\x02\x08")
+
+        bitmap[9] = False
+        self.assertEqual(list(bitmap), [0, 19])
+
+    def test_round_trip(self):
+        bitmap = Bitmap(13)
+
+        for position in (1, 7, 8, 12):
+            bitmap[position] = True
+
+        copy = Bitmap(13, bitmap.to_bytes())
+        self.assertEqual(list(copy), [1, 7, 8, 12])
+
+    def test_data(self):
+        # Missing bytes are cleared.
+        self.assertEqual(list(Bitmap(16, b"\x03")), [0, 1])
+
+        # Extra bytes and bits beyond the size are dropped.
+        bitmap = Bitmap(4, b"\xff\xff")
+        self.assertEqual(list(bitmap), [0, 1, 2, 3])
+        self.assertEqual(bitmap.to_bytes(), b"\x0f")
+
+        # A list of integers is accepted as well.
+        self.assertEqual(list(Bitmap(8, [0x80])), [7])
+
+    def test_out_of_range(self):
+        bitmap = Bitmap(8)
+
+        with self.assertRaises(IndexError):
+            bitmap[8] = True
+
+        with self.assertRaises(IndexError):
+            bitmap[-1]  # pylint: disable=pointless-statement
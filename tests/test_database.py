@@ -0,0 +1,71 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import json
+import os
+import tempfile
+import unittest
+
+from org_fedoraproject_package_remove.service.database import FixtureDatabase
+
+PACKAGES = {
+    "app": {"provides": [], "requires": ["libfoo"], "size": 100},
+    "foo": {"provides": ["libfoo"], "requires": [], "size": 200},
+    "tool": {},
+}
+
+
+class FixtureDatabaseTestCase(unittest.TestCase):
+    """Test the database of packages stored in a JSON file."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "packages.json")
+
+        with open(self._path, "w") as f:
+            json.dump({"packages": PACKAGES}, f)
+
+        self._database = FixtureDatabase(self._path)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _read_names(self):
+        with open(self._path) as f:
+            return sorted(json.load(f)["packages"])
+
+    def _get_names(self):
+        return sorted(name for name, _, _, _ in self._database.get_packages())
+
+    def test_get_packages(self):
+        self.assertEqual(sorted(self._database.get_packages()), [
+            ("app", [], ["libfoo"], 100),
+            ("foo", ["libfoo"], [], 200),
+            ("tool", [], [], 0),
+        ])
+
+    def test_erase(self):
+        self._database.erase(["foo", "tool"])
+        self.assertEqual(self._read_names(), ["app"])
+        self.assertEqual(self._get_names(), ["app"])
+
+    def test_erase_missing(self):
+        with self.assertLogs(level="WARNING"):
+            self._database.erase(["foo", "unknown"])
+
+        self.assertEqual(self._read_names(), ["app", "tool"])
@@ -0,0 +1,86 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+from org_fedoraproject_package_remove.service.dependencies import DependencyGraph
+
+
+class DependencyGraphTestCase(unittest.TestCase):
+    """Test the dependency graph of installed packages."""
+
+    def _create_graph(self):
+        return DependencyGraph([
+            ("app", [], ["libfoo", "/usr/bin/sh"]),
+            ("foo", ["libfoo"], []),
+            ("foo-compat", ["libfoo"], []),
+            ("bash", ["/usr/bin/sh"], ["missing"]),
+            ("plugin", [], ["app"]),
+            ("tool", [], []),
+        ])
+
+    def test_names(self):
+        graph = self._create_graph()
+        self.assertEqual(len(graph), 6)
+        self.assertEqual(sorted(graph.names), ["app", "bash", "foo", "foo-compat", "plugin", "tool"])
+        self.assertEqual(graph.broken_packages, [])
+
+    def test_remove(self):
+        graph = self._create_graph()
+
+        # The requirement is still provided by the other package.
+        graph.remove(["foo"])
+        self.assertEqual(graph.broken_packages, [])
+
+        # Broken packages break their requirers too.
+        graph.remove(["foo-compat"])
+        self.assertEqual(graph.broken_packages, ["app", "plugin"])
+
+        # Removed packages aren't broken.
+        graph.remove(["app"])
+        self.assertEqual(graph.broken_packages, ["plugin"])
+
+    def test_restore(self):
+        graph = self._create_graph()
+        graph.remove(["foo", "foo-compat", "bash"])
+        self.assertEqual(graph.broken_packages, ["app", "plugin"])
+
+        graph.restore(["foo"])
+        self.assertEqual(graph.broken_packages, ["app", "plugin"])
+
+        graph.restore(["bash"])
+        self.assertEqual(graph.broken_packages, [])
+
+    def test_cycle(self):
+        graph = DependencyGraph([
+            ("a", [], ["b"]),
+            ("b", [], ["a", "c"]),
+            ("c", [], []),
+        ])
+
+        graph.remove(["c"])
+        self.assertEqual(graph.broken_packages, ["a", "b"])
+
+        graph.restore(["c"])
+        self.assertEqual(graph.broken_packages, [])
+
+    def test_unknown_packages(self):
+        graph = self._create_graph()
+        graph.remove(["unknown"])
+        graph.restore(["unknown", "tool"])
+        self.assertEqual(graph.broken_packages, [])
@@ -0,0 +1,101 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import json
+import os
+import tempfile
+import unittest
+
+from org_fedoraproject_package_remove.service.database import FixtureDatabase
+
+try:
+    from org_fedoraproject_package_remove.constants import REMOVABLE_PACKAGES_FILE_PATH
+    from org_fedoraproject_package_remove.service.installation import \
+        PackageRemoveImpactTask, PackageRemoveInstallationTask
+except ImportError:
+    # The tasks can run only with Anaconda.
+    PackageRemoveImpactTask = PackageRemoveInstallationTask = None
+
+
+@unittest.skipIf(PackageRemoveInstallationTask is None, "Anaconda is not available")
+class PackageRemoveInstallationTaskTestCase(unittest.TestCase):
+    """Test the installation task."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._sysroot = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _create_database(self, names):
+        path = os.path.join(self._sysroot, "packages.json")
+
+        with open(path, "w") as f:
+            json.dump({"packages": {name: {} for name in names}}, f)
+
+        return FixtureDatabase(path)
+
+    def test_write_list(self):
+        os.makedirs(os.path.join(self._sysroot, os.path.dirname(REMOVABLE_PACKAGES_FILE_PATH)))
+        task = PackageRemoveInstallationTask(sysroot=self._sysroot, pkgs=["foo", "bar"])
+        task.run()
+
+        with open(os.path.join(self._sysroot, REMOVABLE_PACKAGES_FILE_PATH)) as f:
+            self.assertEqual(f.read(), "foo\nbar\n")
+
+    def test_erase(self):
+        database = self._create_database(["foo", "bar", "baz"])
+        task = PackageRemoveInstallationTask(
+            sysroot=self._sysroot, pkgs=["foo", "baz"], database=database
+        )
+        task.run()
+
+        self.assertEqual([name for name, _, _, _ in database.get_packages()], ["bar"])
+        self.assertFalse(os.path.exists(os.path.join(self._sysroot, REMOVABLE_PACKAGES_FILE_PATH)))
+
+    def test_erase_nothing(self):
+        database = self._create_database(["foo"])
+        task = PackageRemoveInstallationTask(sysroot=self._sysroot, pkgs=[], database=database)
+        task.run()
+
+        self.assertEqual([name for name, _, _, _ in database.get_packages()], ["foo"])
+
+
+@unittest.skipIf(PackageRemoveImpactTask is None, "Anaconda is not available")
+class PackageRemoveImpactTaskTestCase(unittest.TestCase):
+    """Test the impact analysis task."""
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "packages.json")
+
+            with open(path, "w") as f:
+                json.dump({"packages": {
+                    "app": {"requires": ["libfoo"], "size": 100},
+                    "foo": {"provides": ["libfoo"], "size": 200},
+                }}, f)
+
+            graph, sizes = PackageRemoveImpactTask(FixtureDatabase(path)).run()
+
+        self.assertEqual(sorted(graph.names), ["app", "foo"])
+        graph.remove(["foo"])
+        self.assertEqual(graph.broken_packages, ["app"])
+
+        sizes.remove(["app", "foo"])
+        self.assertEqual(sizes.total, 300)
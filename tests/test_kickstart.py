@@ -0,0 +1,78 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+try:
+    from org_fedoraproject_package_remove.service.kickstart import PackageRemoveData
+except ImportError:
+    # The kickstart support can run only with Anaconda.
+    PackageRemoveData = None
+
+
+def parse_lines(lines):
+    """Parse lines of the section into new kickstart data."""
+    data = PackageRemoveData()
+
+    for line_number, line in enumerate(lines):
+        data.handle_line(line, line_number)
+
+    return data
+
+
+@unittest.skipIf(PackageRemoveData is None, "Anaconda is not available")
+class PackageRemoveDataTestCase(unittest.TestCase):
+    """Test the kickstart data of the addon."""
+
+    def test_parse(self):
+        data = parse_lines(["# comment\n", "\n", "+ foo\n", "bar\n", "+\n", "  +baz  \n"])
+        self.assertEqual(data.packages, {"foo": True, "bar": False, "baz": True})
+        self.assertEqual(data.list, ["foo", "bar", "baz"])
+        self.assertEqual(data.remove, ["foo", "baz"])
+
+    def test_duplicates(self):
+        data = parse_lines(["foo", "bar", "+foo", "bar"])
+        self.assertEqual(data.packages, {"foo": True, "bar": False})
+
+    def test_set_remove(self):
+        data = parse_lines(["+foo", "bar"])
+        data.remove = ["bar", "baz"]
+        self.assertEqual(data.packages, {"foo": False, "bar": True, "baz": True})
+
+    def test_str(self):
+        data = parse_lines(["+foo", "bar"])
+        self.assertEqual(
+            str(data),
+            "\n%addon org_fedoraproject_package_remove\n+foo\nbar\n%end\n"
+        )
+
+    def test_str_from_file(self):
+        data = parse_lines(["foo"])
+        data.from_file = "/root/packages to remove.list"
+        self.assertEqual(
+            str(data).splitlines()[1],
+            "%addon org_fedoraproject_package_remove --from-file='/root/packages to remove.list'"
+        )
+
+    def test_round_trip(self):
+        lines = ["{}package-{}".format("+" if i % 10 == 0 else "", i) for i in range(50000)]
+        data = parse_lines(lines)
+
+        # Skip the header and the end of the section.
+        copy = parse_lines(str(data).splitlines()[2:-1])
+        self.assertEqual(list(copy.packages.items()), list(data.packages.items()))
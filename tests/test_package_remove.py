@@ -0,0 +1,195 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+try:
+    from org_fedoraproject_package_remove.service.kickstart import PackageRemoveData
+    from org_fedoraproject_package_remove.service.package_remove import PackageRemove
+    from org_fedoraproject_package_remove.service.packages_list import PackagesListCache
+except ImportError:
+    # The service can run only with Anaconda.
+    PackageRemove = None
+
+
+@unittest.skipIf(PackageRemove is None, "Anaconda is not available")
+class FromFileTestCase(unittest.TestCase):
+    """Test the selection read from the file of the --from-file option."""
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "packages to remove.list")
+
+        with open(self._path, "w") as f:
+            f.write("# comment\n+foo\n+bar\nbaz\n+ qux\n")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _create_kickstart(self, *lines, from_file=None):
+        addon_data = PackageRemoveData()
+        addon_data.from_file = from_file or self._path
+
+        for line in lines:
+            addon_data.handle_line(line)
+
+        return SimpleNamespace(addons=SimpleNamespace(org_fedoraproject_package_remove=addon_data))
+
+    def _get_kickstart_packages(self, service):
+        data = self._create_kickstart()
+        service.setup_kickstart(data)
+        return data.addons.org_fedoraproject_package_remove.packages
+
+    def test_lazy_loading(self):
+        service = PackageRemove()
+        service.process_kickstart(self._create_kickstart("baz"))
+
+        # The file isn't read until the selection is needed.
+        os.rename(self._path, self._path + ".moved")
+        self.assertEqual(self._get_kickstart_packages(service), {"baz": False})
+        os.rename(self._path + ".moved", self._path)
+
+        self.assertEqual(list(service._get_selection()), ["bar", "foo", "qux"])
+
+    def test_override(self):
+        service = PackageRemove()
+        service.process_kickstart(self._create_kickstart("+baz", "foo"))
+
+        # The lines of the section override the lines of the file.
+        self.assertEqual(list(service._get_selection()), ["bar", "baz", "qux"])
+
+        # Only the differences from the file are kept in the section.
+        self.assertEqual(self._get_kickstart_packages(service), {"baz": True, "foo": False})
+
+    def test_missing_file(self):
+        service = PackageRemove()
+        service.process_kickstart(self._create_kickstart("+baz", from_file=self._path + ".missing"))
+
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(list(service._get_selection()), ["baz"])
+
+
+@unittest.skipIf(PackageRemove is None, "Anaconda is not available")
+class PublishListTestCase(unittest.TestCase):
+    """Test announcing of changes of the removable packages list."""
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "removable_pkgs.list")
+        self._write("foo")
+
+        self._service = PackageRemove()
+        self._service._packages_list_cache = PackagesListCache(self._path)
+        self._generations = []
+        self._service.list_changed.connect(self._generations.append)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _write(self, *lines):
+        with open(self._path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        # Make sure the change of the file is detected.
+        os.utime(self._path, ns=(0, os.stat(self._path).st_mtime_ns + 1))
+
+    def _refresh(self):
+        """Refresh the list and return the scheduled callbacks."""
+        callbacks = []
+
+        with patch("org_fedoraproject_package_remove.service.package_remove.GLib") as glib:
+            glib.idle_add.side_effect = lambda callback, *args: callbacks.append(callback)
+            self._service._refresh_packages_list()
+
+        return callbacks
+
+    def test_refresh(self):
+        self.assertEqual(self._service.entries, [("foo", False, "")])
+
+        self._write("foo", "bar")
+        callbacks = self._refresh()
+
+        # The change is announced only in the main loop.
+        self.assertEqual(self._service.entries, [("foo", False, "")])
+        callbacks[0]()
+        self.assertEqual(self._service.entries, [("bar", False, ""), ("foo", False, "")])
+        self.assertEqual(self._generations, [1])
+
+    def test_refreshes_out_of_order(self):
+        self.assertEqual(len(self._service.entries), 1)
+
+        self._write("foo", "bar")
+        first = self._refresh()
+        self._write("foo", "bar", "baz")
+        second = self._refresh()
+
+        # The older refresh doesn't announce an older list.
+        second[0]()
+        first[0]()
+        self.assertEqual(len(self._service.entries), 3)
+        self.assertEqual(self._generations, [1])
+
+    def test_refresh_before_expansion(self):
+        self._write("foo", "lib*")
+        callbacks = self._refresh()
+
+        # The patterns were expanded after the refresh.
+        self._service._packages_list_cache.set_universe(["libbar", "libfoo"])
+        callbacks[0]()
+        self.assertEqual(self._service.entries, [
+            ("foo", False, ""),
+            ("libbar", False, ""),
+            ("libfoo", False, ""),
+        ])
+
+    def test_unwatched_change(self):
+        self.assertEqual(len(self._service.entries), 1)
+        self._write("foo", "bar")
+
+        callbacks = []
+
+        with patch("org_fedoraproject_package_remove.service.package_remove.GLib") as glib:
+            glib.idle_add.side_effect = lambda callback, *args: callbacks.append(callback)
+            self.assertEqual(len(self._service.entries), 1)
+
+        # The change is found by the next read and announced in the main loop.
+        callbacks[0]()
+        self.assertEqual(len(self._service.entries), 2)
+        self.assertEqual(self._generations, [1])
+
+    def test_invalidate(self):
+        self.assertEqual(len(self._service.entries), 1)
+        cache = self._service.packages_list_cache
+        misses = cache.misses
+
+        self._service.invalidate_packages_list()
+        self.assertEqual(cache.misses, misses + 1)
+        self.assertEqual(self._generations, [])
+
+        with open(self._path, "a") as f:
+            f.write("bar\n")
+
+        self._service.invalidate_packages_list()
+        self.assertEqual(len(self._service.entries), 2)
+        self.assertEqual(self._generations, [1])
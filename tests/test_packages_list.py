@@ -0,0 +1,135 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import os
+import tempfile
+import unittest
+
+from org_fedoraproject_package_remove.service.packages_list import _merge_lines, \
+    _compile_patterns, _expand_patterns, PackagesListCache
+
+
+class MergeLinesTestCase(unittest.TestCase):
+    """Test merging of sorted lists of lines."""
+
+    def test_merge(self):
+        self.assertEqual(_merge_lines([]), [])
+        self.assertEqual(_merge_lines([["a", "c"], ["b", "d"], []]), ["a", "b", "c", "d"])
+
+    def test_duplicates(self):
+        self.assertEqual(_merge_lines([["a", "b"], ["b", "c"], ["a"]]), ["a", "b", "c"])
+
+    def test_marked_duplicates(self):
+        self.assertEqual(_merge_lines([["+foo", "bar"], ["foo"]]), ["+foo", "bar"])
+        self.assertEqual(_merge_lines([["foo"], ["+bar", "+foo"]]), ["+bar", "+foo"])
+
+
+class PackagesListCacheTestCase(unittest.TestCase):
+    """Test the cache of the removable packages list files."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "removable_pkgs.list")
+        self._dir_path = os.path.join(self._dir.name, "removable_pkgs.list.d")
+        os.mkdir(self._dir_path)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _write(self, path, *lines):
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def test_fragments(self):
+        self._write(self._path, "+ baz", "foo", "# comment", "", "bar")
+        self._write(os.path.join(self._dir_path, "docs.list"), "+baz", "+foo")
+        self._write(os.path.join(self._dir_path, "extra.list"), "foo", "qux")
+        self._write(os.path.join(self._dir_path, "ignored.txt"), "ignored")
+
+        packages_list = PackagesListCache(self._path, self._dir_path).get()
+        self.assertEqual(packages_list.lines, ["+baz", "+foo", "bar", "qux"])
+
+        # The fragments name the groups, the list file doesn't.
+        self.assertEqual(packages_list.entries, [
+            ("baz", True, "docs"),
+            ("foo", True, "docs"),
+            ("bar", False, ""),
+            ("qux", False, "extra"),
+        ])
+
+    def test_counters(self):
+        self._write(self._path, "foo")
+        cache = PackagesListCache(self._path)
+
+        cache.get()
+        cache.get()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # A watched cache doesn't check the files.
+        cache.watched = True
+        cache.get()
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_invalidate(self):
+        self._write(self._path, "foo")
+        cache = PackagesListCache(self._path)
+        cache.watched = True
+        packages_list = cache.get()
+
+        cache.invalidate()
+        self.assertIsNot(cache.get(), packages_list)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+
+class PatternsTestCase(unittest.TestCase):
+    """Test matching of glob patterns."""
+
+    NAMES = ["bash", "bash-doc", "foo-devel", "foo-doc", "libfoo", "libbar", "python3-foo"]
+
+    def _match(self, *patterns):
+        match = _compile_patterns(list(patterns))
+        return [name for name in self.NAMES if match(name)]
+
+    def test_no_patterns(self):
+        self.assertIsNone(_compile_patterns([]))
+
+    def test_prefix(self):
+        self.assertEqual(self._match("foo-*"), ["foo-devel", "foo-doc"])
+        self.assertEqual(self._match("*"), self.NAMES)
+
+    def test_suffix(self):
+        self.assertEqual(self._match("*-doc"), ["bash-doc", "foo-doc"])
+        self.assertEqual(self._match("+ *foo"), ["libfoo", "python3-foo"])
+
+    def test_other_patterns(self):
+        self.assertEqual(self._match("lib???"), ["libfoo", "libbar"])
+        self.assertEqual(self._match("foo-*l"), ["foo-devel"])
+        self.assertEqual(self._match("*-d[eo]*"), ["bash-doc", "foo-devel", "foo-doc"])
+        self.assertEqual(self._match("?ash"), ["bash"])
+
+    def test_mixed_patterns(self):
+        self.assertEqual(
+            self._match("bash*", "*bar", "lib?oo", "*3-*"),
+            ["bash", "bash-doc", "libfoo", "libbar", "python3-foo"]
+        )
+
+    def test_expand(self):
+        self.assertEqual(
+            _expand_patterns(["foo-*", "+*-doc"], self.NAMES, ["foo-devel"]),
+            ["+bash-doc", "+foo-doc"]
+        )
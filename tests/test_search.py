@@ -0,0 +1,54 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+from org_fedoraproject_package_remove.search import PackageIndex
+
+NAMES = ["bash", "bash-completion", "python3-libs", "python3-pip", "libreoffice-core", "Xorg"]
+
+
+class PackageIndexTestCase(unittest.TestCase):
+    """Test the search index of package names."""
+
+    def setUp(self):
+        self._index = PackageIndex(NAMES)
+
+    def test_length(self):
+        self.assertEqual(len(self._index), len(NAMES))
+
+    def test_short_text(self):
+        self.assertEqual(self._index.find(""), list(range(len(NAMES))))
+        self.assertEqual(self._index.find("li"), [2, 4])
+
+    def test_substring(self):
+        self.assertEqual(self._index.find("bash"), [0, 1])
+        self.assertEqual(self._index.find("lib"), [2, 4])
+        self.assertEqual(self._index.find("3-pi"), [3])
+
+    def test_case_insensitive(self):
+        self.assertEqual(self._index.find("xorg"), [5])
+        self.assertEqual(self._index.find("PYTHON"), [2, 3])
+
+    def test_no_match(self):
+        self.assertEqual(self._index.find("zsh"), [])
+
+    def test_ngrams_in_other_order(self):
+        # The name contains all n-grams of the text, but not the text.
+        index = PackageIndex(["abcd-bcde", "abcde"])
+        self.assertEqual(index.find("abcde"), [1])
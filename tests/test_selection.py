@@ -0,0 +1,53 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+from org_fedoraproject_package_remove.service.selection import PackageSelection
+
+
+class PackageSelectionTestCase(unittest.TestCase):
+    """Test the selection of packages to remove."""
+
+    def test_select(self):
+        selection = PackageSelection()
+        self.assertEqual(selection.select(["b", "a", "b"]), ["b", "a"])
+        self.assertEqual(selection.select(["a", "c"]), ["c"])
+        self.assertEqual(list(selection), ["a", "b", "c"])
+        self.assertEqual(len(selection), 3)
+        self.assertIn("a", selection)
+
+    def test_deselect(self):
+        selection = PackageSelection()
+        selection.select(["a", "b"])
+        self.assertEqual(selection.deselect(["b", "c", "b"]), ["b"])
+        self.assertEqual(list(selection), ["a"])
+        self.assertNotIn("b", selection)
+
+    def test_toggle(self):
+        selection = PackageSelection()
+        selection.select(["a"])
+        self.assertEqual(selection.toggle(["a", "b", "b"]), (["b"], ["a"]))
+        self.assertEqual(list(selection), ["b"])
+
+    def test_replace(self):
+        selection = PackageSelection()
+        selection.select(["a", "b"])
+        self.assertEqual(selection.replace(["c", "b", "d"]), (["c", "d"], ["a"]))
+        self.assertEqual(list(selection), ["b", "c", "d"])
+        self.assertEqual(selection.replace(["b", "c", "d"]), ([], []))
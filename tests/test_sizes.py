@@ -0,0 +1,47 @@
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+
+import unittest
+
+from org_fedoraproject_package_remove.service.sizes import SizeIndex
+
+
+class SizeIndexTestCase(unittest.TestCase):
+    """Test the index of sizes of installed packages."""
+
+    def test_total(self):
+        index = SizeIndex({"a": 100, "b": 20, "c": 3})
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.total, 0)
+
+        index.remove(["a", "c"])
+        self.assertEqual(index.total, 103)
+
+        index.remove(["b"])
+        self.assertEqual(index.total, 123)
+
+        index.restore(["a"])
+        self.assertEqual(index.total, 23)
+
+    def test_unknown_packages(self):
+        index = SizeIndex({"a": 100})
+        index.remove(["a", "unknown"])
+        self.assertEqual(index.total, 100)
+
+        index.restore(["unknown"])
+        self.assertEqual(index.total, 100)